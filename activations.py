@@ -1,9 +1,60 @@
 import numpy as np
 
+# Every activation takes an optional out array so it can be applied in place without allocating.
 
-def neat_sigmoid(x):
-    return 1 / (1 + np.exp(-4.9 * x))
 
+def neat_sigmoid(x, out=None):
+    if out is None:
+        return 1 / (1 + np.exp(-4.9 * x))
+    np.multiply(x, -4.9, out=out)
+    np.exp(out, out=out)
+    np.add(out, 1, out=out)
+    return np.reciprocal(out, out=out)
 
-def tanh(x):
-    return np.tanh(x)
+
+def tanh(x, out=None):
+    return np.tanh(x, out=out)
+
+
+def relu(x, out=None):
+    return np.maximum(x, 0.0, out=out)
+
+
+def gaussian(x, out=None):
+    if out is None:
+        return np.exp(-5.0 * np.square(x))
+    np.square(x, out=out)
+    np.multiply(out, -5.0, out=out)
+    return np.exp(out, out=out)
+
+
+def identity(x, out=None):
+    if out is None:
+        return np.array(x, dtype=np.float64)
+    np.copyto(out, x)
+    return out
+
+
+def sin(x, out=None):
+    return np.sin(x, out=out)
+
+
+# Every activation a node can use, by name. All of them work element-wise on arrays.
+# A node's activation is stored as its index in this dict, so new functions must be added at the end.
+ACTIVATIONS = {
+    "sigmoid": neat_sigmoid,
+    "tanh": tanh,
+    "relu": relu,
+    "gaussian": gaussian,
+    "identity": identity,
+    "sin": sin,
+}
+ACTIVATION_NAMES = list(ACTIVATIONS)
+ACTIVATION_FUNCTIONS = list(ACTIVATIONS.values())
+DEFAULT_ACTIVATION = "sigmoid"
+
+
+def get_activation_id(name: str) -> int:
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unknown activation '{name}', expected one of {ACTIVATION_NAMES}.")
+    return ACTIVATION_NAMES.index(name)
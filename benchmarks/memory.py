@@ -0,0 +1,50 @@
+"""
+Compares the memory used by a population stored as Genome objects with the
+same population stored as GeneArrays.
+
+Usage: python -m benchmarks.memory [--genomes 10000] [--genes 100]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from connection import Connection
+from genes import GeneArrays
+from genome import Genome
+
+
+def create_genome(num_inputs: int, num_outputs: int, num_genes: int) -> Genome:
+    connections = set(
+        Connection(random.randint(1, num_inputs), num_inputs + num_outputs + i + 1, random.random() * 2 - 1, True, i + 1)
+        for i in range(num_genes)
+    )
+    return Genome(num_inputs, num_outputs, connections)
+
+
+def measure(create) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = create()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--genomes", type=int, default=10000)
+    parser.add_argument("--genes", type=int, default=100)
+    args = parser.parse_args()
+
+    random.seed(0)
+    genomes, object_size = measure(lambda: [create_genome(4, 2, args.genes) for _ in range(args.genomes)])
+    _, array_size = measure(lambda: [GeneArrays.from_genome(genome) for genome in genomes])
+
+    print(f"{args.genomes} genomes with {args.genes} genes each")
+    print(f"Genome objects: {object_size / 2**20:.1f} MiB ({object_size / args.genomes:.0f} B per genome)")
+    print(f"GeneArrays:     {array_size / 2**20:.1f} MiB ({array_size / args.genomes:.0f} B per genome)")
+
+
+if __name__ == "__main__":
+    main()
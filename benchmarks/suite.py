@@ -0,0 +1,166 @@
+"""
+Times the hot paths of the library on seeded synthetic genomes and writes the
+results as JSON, so runs on different commits can be compared.
+
+Usage: python -m benchmarks.suite [--genes 10 100 1000] [--populations 256 2000 10000] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from typing import Callable
+
+import numpy as np
+
+from main import xor
+from genome import Genome
+from neat import Neat
+
+
+def synthetic_genome(neat: Neat, rng: random.Random, num_genes: int) -> Genome:
+    """
+    Creates a feed forward genome with num_genes connections. Nodes are
+    ordered inputs, hidden, outputs and connections only point forward, so
+    genomes built from the same Neat share most of their innovation ids.
+    """
+    num_hidden = max(1, num_genes // 4)
+    inputs = list(range(1, neat.num_inputs + 1))
+    outputs = list(range(neat.num_inputs + 1, neat.num_inputs + neat.num_outputs + 1))
+    hidden = list(range(neat.num_inputs + neat.num_outputs + 1, neat.num_inputs + neat.num_outputs + num_hidden + 1))
+    order = inputs + hidden + outputs
+    num_genes = min(num_genes, sum(len(order) - max(i + 1, len(inputs)) for i in range(len(inputs) + len(hidden))))
+
+    edges = set()
+    while len(edges) < num_genes:
+        first = rng.randrange(len(inputs) + len(hidden))
+        second = rng.randrange(max(first + 1, len(inputs)), len(order))
+        edges.add((order[first], order[second]))
+
+    genome = Genome(neat.num_inputs, neat.num_outputs)
+    for edge in sorted(edges):
+        genome.add_connection(neat.create_connection(edge, rng.uniform(-1, 1)))
+    neat.innovations.node_ids.reserve_up_to(genome.max_node)
+    return genome
+
+
+def measure(function: Callable[[], object], repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "repeat": repeat}
+
+
+def benchmark_genomes(num_genes: int, seed: int, repeat: int) -> list[dict]:
+    rng = random.Random(seed)
+    random.seed(seed)
+    neat = Neat(4, 2, 1, seed=seed)
+    genomes = [synthetic_genome(neat, rng, num_genes) for _ in range(64)]
+    inputs = [rng.uniform(-1, 1) for _ in range(neat.num_inputs)]
+    params = {"genes": num_genes}
+
+    def feed_forward():
+        for genome in genomes:
+            genome.invalidate_network()
+            genome.feed_forward(inputs)
+
+    def feed_forward_cached():
+        for genome in genomes:
+            genome.feed_forward(inputs)
+
+    def calculate_distance():
+        for first, second in zip(genomes, genomes[1:]):
+            neat.calculate_distance(first, second)
+
+    def cross_over():
+        for first, second in zip(genomes, genomes[1:]):
+            neat.cross_over(first, second)
+
+    def mutate():
+        neat.mutate_population([genome.copy() for genome in genomes])
+
+    # Every benchmark runs over 64 genomes (or 63 pairs), reported per call.
+    return [
+        {"name": name, "params": params, "calls": calls, "seconds": measure(function, repeat)}
+        for name, calls, function in (
+            ("feed_forward", len(genomes), feed_forward),
+            ("feed_forward_cached", len(genomes), feed_forward_cached),
+            ("calculate_distance", len(genomes) - 1, calculate_distance),
+            ("cross_over", len(genomes) - 1, cross_over),
+            ("mutate", len(genomes), mutate),
+        )
+    ]
+
+
+def benchmark_population(population_size: int, num_genes: int, generations: int, seed: int, repeat: int) -> list[dict]:
+    rng = random.Random(seed)
+    random.seed(seed)
+    neat = Neat(2, 1, population_size, xor, seed=seed)
+    neat.population = [synthetic_genome(neat, rng, num_genes) for _ in range(population_size)]
+    params = {"population": population_size, "genes": num_genes}
+
+    def separate_species():
+        neat.species = []
+        neat.distance_cache = {}
+        neat.separate_species()
+
+    results = [{"name": "separate_species", "params": params, "calls": 1, "seconds": measure(separate_species, repeat)}]
+
+    timings = []
+    for _ in range(generations):
+        asyncio.run(neat.create_generation())
+        timings.append(neat.metrics["timings"])
+    results.append({
+        "name": "create_generation",
+        "params": dict(params, generations=generations),
+        "calls": 1,
+        "seconds": {phase: statistics.median(t[phase] for t in timings) for phase in timings[0]},
+    })
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--genes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--populations", type=int, nargs="+", default=[256, 2000, 10000])
+    parser.add_argument("--population-genes", type=int, default=10, help="genes per genome in the population benchmarks")
+    parser.add_argument("--generations", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for num_genes in args.genes:
+        results.extend(benchmark_genomes(num_genes, args.seed, args.repeat))
+    for population_size in args.populations:
+        results.extend(benchmark_population(population_size, args.population_genes, args.generations, args.seed, min(args.repeat, 3)))
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+import activations
+from connection import Connection
+from genome import Genome
+
+FORMAT_VERSION = 4
+
+
+def pack_genomes(genomes: list[Genome]) -> dict[str, np.ndarray]:
+    """
+    Flattens genomes into parallel gene arrays. The genes of genome i are
+    the slice offsets[i]:offsets[i + 1] of every gene array.
+    """
+    genes = [con for genome in genomes for con in genome.get_sorted_connections()]
+    node_activations = [item for genome in genomes for item in sorted(genome.node_activations.items())]
+    return {
+        "offsets": np.cumsum([0] + [len(genome.connections) for genome in genomes], dtype=np.int64),
+        "fitness": np.array([genome.fitness for genome in genomes], dtype=np.float64),
+        "innovation": np.array([con.innovation_id for con in genes], dtype=np.int64),
+        "first": np.array([con.first for con in genes], dtype=np.int32),
+        "second": np.array([con.second for con in genes], dtype=np.int32),
+        "weight": np.array([con.weight for con in genes], dtype=np.float64),
+        "enabled": np.array([con.enabled for con in genes], dtype=np.bool_),
+        "activation_offsets": np.cumsum([0] + [len(genome.node_activations) for genome in genomes], dtype=np.int64),
+        "activation_node": np.array([node for node, _ in node_activations], dtype=np.int32),
+        "activation_id": np.array([activations.get_activation_id(name) for _, name in node_activations], dtype=np.int8),
+    }
+
+
+def unpack_genomes(arrays, num_inputs: int, num_outputs: int) -> list[Genome]:
+    offsets = arrays["offsets"].tolist()
+    genes = list(zip(
+        arrays["first"].tolist(),
+        arrays["second"].tolist(),
+        arrays["weight"].tolist(),
+        arrays["enabled"].tolist(),
+        arrays["innovation"].tolist(),
+    ))
+    activation_offsets = arrays["activation_offsets"].tolist()
+    node_activations = list(zip(
+        arrays["activation_node"].tolist(),
+        [activations.ACTIVATION_NAMES[i] for i in arrays["activation_id"].tolist()],
+    ))
+    genomes = []
+    for i, fitness in enumerate(arrays["fitness"].tolist()):
+        genome = Genome(num_inputs, num_outputs, set(Connection(*gene) for gene in genes[offsets[i]:offsets[i + 1]]))
+        genome.node_activations = dict(node_activations[activation_offsets[i]:activation_offsets[i + 1]])
+        genome.fitness = fitness
+        genomes.append(genome)
+    return genomes
+
+
+def write_checkpoint(path: str, header: dict, genomes: list[Genome], arrays: dict[str, np.ndarray]) -> None:
+    """
+    Writes a checkpoint as an uncompressed .npz file: a JSON header, the
+    genomes as flat gene arrays and any extra arrays. The members are stored
+    as they are, so read_checkpoint can memory-map them.
+    """
+    header = dict(header, format=FORMAT_VERSION)
+    with open(path, "wb") as file:
+        np.savez(file, header=np.array(json.dumps(header)), **pack_genomes(genomes), **arrays)
+
+
+def read_checkpoint(path: str) -> tuple[dict, list[Genome], dict[str, np.ndarray]]:
+    """
+    Reads a checkpoint written by write_checkpoint. The arrays are
+    memory-mapped read-only, so only the pages that are used are read, e.g.
+    the gene arrays while the genomes are rebuilt.
+    """
+    arrays = _map_npz(path)
+    header = json.loads(str(arrays.pop("header")))
+    if header["format"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format {header['format']}, expected {FORMAT_VERSION}.")
+    return header, unpack_genomes(arrays, header["num_inputs"], header["num_outputs"]), arrays
+
+
+def _map_npz(path: str) -> dict[str, np.ndarray]:
+    # np.load can't memory-map the members of an .npz file, but uncompressed members are plain .npy files at known offsets.
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as file:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # The member's data follows its local file header, whose name and extra field lengths are the last two fields.
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", file.read(4))
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(file)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(file)
+            if dtype.hasobject or 0 in shape or shape == ():
+                # Object, empty and scalar arrays can't or needn't be mapped.
+                file.seek(info.header_offset + 30 + name_length + extra_length)
+                arrays[name] = np.lib.format.read_array(file, allow_pickle=False)
+            else:
+                order = "F" if fortran_order else "C"
+                arrays[name] = np.memmap(file, dtype=dtype, mode="r", offset=file.tell(), shape=shape, order=order)
+    return arrays
@@ -1,4 +1,6 @@
 class Connection:
+    __slots__ = ("first", "second", "weight", "enabled", "innovation_id")
+
     def __init__(
         self, first: int, second: int, weight: float, enabled: bool, innovation_id: int
     ) -> None:
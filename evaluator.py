@@ -0,0 +1,131 @@
+import abc
+import asyncio
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from genome import Genome
+
+
+def run_fitness_function(fitness_function: Callable, genome: Genome) -> float:
+    """
+    Runs a fitness function on a genome and returns its fitness. Fitness
+    functions may be coroutines and may either return the fitness or store it
+    in genome.fitness.
+    """
+    result = fitness_function(genome)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return genome.fitness if result is None else result
+
+
+def _evaluate_chunk(fitness_function: Callable, chunk: list) -> list[float]:
+    return [run_fitness_function(fitness_function, Genome.deserialize(data)) for data in chunk]
+
+
+def _evaluate_genomes(fitness_function: Callable, genomes: list[Genome]) -> list[float]:
+    return [run_fitness_function(fitness_function, genome) for genome in genomes]
+
+
+class AsyncEvaluator:
+    """
+    Awaits every fitness function on the running event loop. This is the
+    default, and only helps when the fitness functions actually await.
+    """
+
+    async def evaluate(self, genomes: list[Genome], fitness_function: Callable) -> None:
+        for fitness in asyncio.as_completed([fitness_function(genome) for genome in genomes]):
+            await fitness
+
+    def close(self) -> None:
+        pass
+
+
+class PoolEvaluator(abc.ABC):
+    """
+    Evaluates genomes in chunks on a pool of workers and writes the resulting
+    fitness values back to the genomes.
+
+    workers(optional): The number of workers, defaults to the number of CPUs.
+    chunks_per_worker(optional): How many chunks each worker receives per generation.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunks_per_worker: int = 4) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self.executor: Optional[Executor] = None
+
+    @abc.abstractmethod
+    def create_executor(self) -> Executor:
+        pass
+
+    def prepare_chunk(self, genomes: list[Genome]):
+        return genomes
+
+    # Must be a top level function so it can be sent to worker processes.
+    evaluate_chunk = staticmethod(_evaluate_genomes)
+
+    async def evaluate(self, genomes: list[Genome], fitness_function: Callable) -> None:
+        if self.executor is None:
+            self.executor = self.create_executor()
+        loop = asyncio.get_running_loop()
+        chunk_size = max(1, math.ceil(len(genomes) / (self.workers * self.chunks_per_worker)))
+        chunks = [genomes[i:i + chunk_size] for i in range(0, len(genomes), chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, self.evaluate_chunk, fitness_function, self.prepare_chunk(chunk))
+            for chunk in chunks
+        ))
+        for chunk, fitnesses in zip(chunks, results):
+            for genome, fitness in zip(chunk, fitnesses):
+                genome.fitness = fitness
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class ThreadEvaluator(PoolEvaluator):
+    """
+    Evaluates genomes on a thread pool. Genomes are shared with the workers,
+    so this only scales when the fitness function releases the GIL.
+    """
+
+    def create_executor(self) -> Executor:
+        return ThreadPoolExecutor(self.workers)
+
+
+class ProcessEvaluator(PoolEvaluator):
+    """
+    Evaluates genomes on a process pool. Genomes are sent to the workers in
+    their serialized form, so the fitness function must be picklable, i.e.
+    defined at the top level of a module.
+    """
+
+    def create_executor(self) -> Executor:
+        return ProcessPoolExecutor(self.workers)
+
+    def prepare_chunk(self, genomes: list[Genome]):
+        return [genome.serialize() for genome in genomes]
+
+    evaluate_chunk = staticmethod(_evaluate_chunk)
+
+
+EVALUATORS = {
+    "async": AsyncEvaluator,
+    "thread": ThreadEvaluator,
+    "process": ProcessEvaluator,
+}
+
+
+def create_evaluator(name, workers: Optional[int] = None):
+    """
+    Creates the evaluator with the given name, or returns name itself if it
+    is already an evaluator, i.e. has evaluate and close methods.
+    """
+    if not isinstance(name, str):
+        return name
+    if name not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator '{name}', expected one of {list(EVALUATORS)}.")
+    return EVALUATORS[name]() if name == "async" else EVALUATORS[name](workers)
@@ -0,0 +1,94 @@
+"""
+A standalone file format for compiled networks, so an evolved network can be
+served with only NumPy, network.py and activations.py, e.g.
+
+    export_network(neat.best_genome.get_network(), "best.net")
+    outputs = load_network("best.net").activate(inputs)
+
+A file is the magic bytes, the length of a JSON header as a little-endian
+uint32, the header, and then the arrays of Network.to_arrays, each starting
+at a multiple of ALIGNMENT bytes. These hold the compiled layout itself,
+including the layer table, in the dtypes Network uses. The header holds the
+shape, dtype and offset of every array, which the loader memory-maps and
+hands to Network.from_arrays, so loading neither copies nor reorders them.
+"""
+import json
+import struct
+
+import numpy as np
+
+import activations
+from network import Network
+
+MAGIC = b"NEATNET\x00"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+
+def export_network(network: Network, path: str) -> None:
+    """
+    Writes network to path. Nodes are stored in the network's topological
+    order and connections sorted by destination, so loading doesn't reorder
+    anything.
+    """
+    # Arrays are stored little-endian, which is also the native order on every platform numpy runs on in practice.
+    arrays = {name: np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")) for name, array in network.to_arrays().items()}
+    header = {
+        "format": FORMAT_VERSION,
+        "num_inputs": network.num_inputs,
+        # Activation ids are stored with their names, so they survive changes to activations.ACTIVATIONS.
+        "activations": activations.ACTIVATION_NAMES,
+        "arrays": {},
+    }
+    # Offsets are relative to the end of the header, so they don't depend on the header's own length.
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    encoded = json.dumps(header).encode()
+    start = _align(len(MAGIC) + 4 + len(encoded))
+    with open(path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+        for name, array in arrays.items():
+            file.seek(start + header["arrays"][name]["offset"])
+            file.write(array.tobytes())
+        file.truncate(start + offset)
+
+
+def load_network(path: str) -> Network:
+    """
+    Loads a network written by export_network. The arrays are memory-mapped
+    read-only and used as they are, so loading is fast however large the
+    network is.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not an exported network.")
+        (length,) = struct.unpack("<I", file.read(4))
+        header = json.loads(file.read(length))
+    if header["format"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported network format {header['format']}, expected {FORMAT_VERSION}.")
+
+    start = _align(len(MAGIC) + 4 + length)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        if 0 in spec["shape"]:
+            arrays[name] = np.empty(spec["shape"], dtype=spec["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r", offset=start + spec["offset"], shape=tuple(spec["shape"]))
+
+    if header["activations"] != activations.ACTIVATION_NAMES:
+        unknown = set(header["activations"]) - set(activations.ACTIVATIONS)
+        if unknown:
+            raise ValueError(f"Unknown activation functions {sorted(unknown)}.")
+        # Only needed when the registry changed since the export.
+        activation_ids = np.array([activations.get_activation_id(name) for name in header["activations"]], dtype=np.int8)
+        arrays["activation"] = activation_ids[arrays["activation"]]
+        arrays["group_table"] = np.array(arrays["group_table"])
+        arrays["group_table"][:, 0] = activation_ids[arrays["group_table"][:, 0]]
+    return Network.from_arrays(header["num_inputs"], arrays)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,62 @@
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from genome import Genome
+
+
+class FitnessCache:
+    def __init__(self, max_size: int = 10000, deterministic: bool = True, resample_every: int = 1) -> None:
+        """
+        A bounded, least recently used cache of fitness values keyed by a
+        hash of a genome's enabled genes, weights and activations, so that
+        unchanged networks such as elites are not evaluated again.
+
+        max_size(optional): The most fitness values kept.
+        deterministic(optional): Whether the fitness function always gives the same fitness for the same network.
+        resample_every(optional): For fitness functions that aren't deterministic, how many generations a cached fitness is reused.
+        """
+        self.max_size = max_size
+        self.deterministic = deterministic
+        self.resample_every = resample_every
+        self.entries: OrderedDict[bytes, tuple[float, int]] = OrderedDict()
+        # Neat looks up every distinct network once per generation, so every miss is one evaluation.
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(genome: Genome) -> bytes:
+        innovations, weights = genome.get_gene_arrays()
+        enabled = np.array([genome.connection_index[innovation_id].enabled for innovation_id in genome.innovations], dtype=np.bool_)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(innovations[enabled].tobytes())
+        digest.update(weights[enabled].tobytes())
+        digest.update(repr(sorted(genome.node_activations.items())).encode())
+        return digest.digest()
+
+    def get(self, key: bytes, generation: int) -> Optional[float]:
+        entry = self.entries.get(key)
+        if entry is not None and not self.deterministic and generation - entry[1] >= self.resample_every:
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: bytes, fitness: float, generation: int) -> None:
+        self.entries[key] = (fitness, generation)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate()}
@@ -0,0 +1,97 @@
+import numpy as np
+
+import activations
+from connection import Connection
+from genome import Genome
+
+
+class GeneArrays:
+    __slots__ = (
+        "num_inputs", "num_outputs", "innovation", "first", "second", "weight", "enabled",
+        "activation_node", "activation_id", "fitness",
+    )
+
+    def __init__(
+        self,
+        num_inputs: int,
+        num_outputs: int,
+        innovation: np.ndarray,
+        first: np.ndarray,
+        second: np.ndarray,
+        weight: np.ndarray,
+        enabled: np.ndarray,
+        activation_node: np.ndarray = (),
+        activation_id: np.ndarray = (),
+    ) -> None:
+        """
+        A compact genome stored as parallel typed arrays, one entry per gene,
+        sorted by innovation id. This avoids a Python object per connection,
+        which matters for large populations of large genomes. It is a storage
+        format only: evolution works on Genome, see from_genome and to_genome.
+
+        num_inputs: The number of inputs for this genome.
+        num_outputs: The number of outputs for this genome.
+        innovation, first, second, weight, enabled: The fields of every gene.
+        activation_node, activation_id(optional): The nodes that don't use the default activation and the id of
+            their activation, see activations.ACTIVATIONS.
+        """
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.innovation = np.asarray(innovation, dtype=np.int64)
+        self.first = np.asarray(first, dtype=np.int32)
+        self.second = np.asarray(second, dtype=np.int32)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.enabled = np.asarray(enabled, dtype=np.bool_)
+        self.activation_node = np.asarray(activation_node, dtype=np.int32)
+        self.activation_id = np.asarray(activation_id, dtype=np.int8)
+        self.fitness = 0
+
+    @classmethod
+    def from_genome(cls, genome: Genome) -> "GeneArrays":
+        genes = genome.get_sorted_connections()
+        node_activations = sorted(genome.node_activations.items())
+        arrays = cls(
+            genome.num_inputs,
+            genome.num_outputs,
+            [con.innovation_id for con in genes],
+            [con.first for con in genes],
+            [con.second for con in genes],
+            [con.weight for con in genes],
+            [con.enabled for con in genes],
+            [node for node, _ in node_activations],
+            [activations.get_activation_id(name) for _, name in node_activations],
+        )
+        arrays.fitness = genome.fitness
+        return arrays
+
+    def to_genome(self) -> Genome:
+        connections = set(
+            Connection(first, second, weight, enabled, innovation_id)
+            for first, second, weight, enabled, innovation_id in zip(
+                self.first.tolist(), self.second.tolist(), self.weight.tolist(), self.enabled.tolist(), self.innovation.tolist()
+            )
+        )
+        genome = Genome(self.num_inputs, self.num_outputs, connections)
+        genome.node_activations = {
+            node: activations.ACTIVATION_NAMES[i] for node, i in zip(self.activation_node.tolist(), self.activation_id.tolist())
+        }
+        genome.fitness = self.fitness
+        return genome
+
+    def __len__(self) -> int:
+        return len(self.innovation)
+
+    def copy(self) -> "GeneArrays":
+        arrays = GeneArrays(
+            self.num_inputs,
+            self.num_outputs,
+            self.innovation.copy(),
+            self.first.copy(),
+            self.second.copy(),
+            self.weight.copy(),
+            self.enabled.copy(),
+            self.activation_node.copy(),
+            self.activation_id.copy(),
+        )
+        arrays.fitness = self.fitness
+        return arrays
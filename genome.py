@@ -1,8 +1,17 @@
+import bisect
+import itertools
+import numpy as np
+
 import activations
 from connection import Connection
+from network import Network, RecurrentNetwork
 
 
 class Genome:
+
+    # Gives every genome a unique id, used to key cached distances between genomes.
+    ids = itertools.count()
+
     def __init__(
         self, num_inputs: int, num_outputs: int, connections: list[Connection] = set()
     ) -> None:
@@ -16,10 +25,20 @@ class Genome:
         """
         self.num_inputs = num_inputs
         self.num_outputs = num_outputs
+        self.id = next(Genome.ids)
+        # Incremented whenever the connections or their weights change.
+        self.version = 0
+        self.network = None
+        self.recurrent_network = None
+        self.gene_arrays = None
+        # Activation function names of the nodes that don't use the default activation.
+        self.node_activations: dict[int, str] = {}
+        # Whether the genome may contain cycles, so it is evaluated with its recurrent network.
+        self.recurrent = False
         if len(connections) == 0:
             self.nodes = {"inputs": set(range(1, num_inputs + 1)), "hidden": set(), "outputs": set(range(num_inputs + 1, num_outputs + num_inputs + 1))}
             self.connections = set()
-            self.connection_map = dict()
+            self.connection_map = {x: [] for x in self.get_node_list()}
         else:
             all_nodes = set(con.first for con in connections).union(con.second for con in connections)
             self.nodes = {
@@ -31,66 +50,169 @@ class Genome:
             })
             self.connections = connections
             self.create_connection_map()
+        # Connections by innovation id, and the innovation ids in ascending order.
+        self.connection_index = {con.innovation_id: con for con in self.connections}
+        self.innovations = sorted(self.connection_index)
+        self.max_node = max(self.get_node_list())
         self.fitness = 0
 
 
+    def clear(self) -> None:
+        """
+        Removes every connection, hidden node and activation gene so the
+        genome can be reused, see pool.GenomePool.
+        """
+        for node in self.nodes["hidden"]:
+            del self.connection_map[node]
+        for incoming in self.connection_map.values():
+            incoming.clear()
+        self.nodes["hidden"].clear()
+        self.connections.clear()
+        self.connection_index.clear()
+        self.innovations.clear()
+        self.node_activations.clear()
+        self.max_node = max(self.get_node_list())
+        self.fitness = 0
+        self.invalidate_network()
+
+
     def has_connection(self, connection: Connection):
-        return connection in self.connections
+        return connection.innovation_id in self.connection_index
 
 
     def add_connection(self, connection: Connection) -> None:
+        """
+        Adds a connection, updating the nodes and connection map in place
+        rather than rebuilding them.
+        """
+        if connection.innovation_id in self.connection_index:
+            return
+        self.connection_index[connection.innovation_id] = connection
+        bisect.insort(self.innovations, connection.innovation_id)
         self.connections.add(connection)
-        all_nodes = set(con.first for con in self.connections).union(con.second for con in self.connections)
-        self.nodes = {
-            "inputs": set(range(1, self.num_inputs + 1)), 
-            "outputs": set(range(self.num_inputs + 1, self.num_outputs + self.num_inputs + 1)),
-        }
-        self.nodes.update({
-            "hidden": all_nodes - self.nodes["inputs"] - self.nodes["outputs"]
-        })
-        self.create_connection_map()
+        for node in (connection.first, connection.second):
+            if node not in self.connection_map:
+                self.nodes["hidden"].add(node)
+                self.connection_map[node] = []
+                self.max_node = max(self.max_node, node)
+        if connection.enabled:
+            self.connection_map[connection.second].append(connection.first)
+        self.invalidate_network()
+
+
+    def disable_connection(self, connection: Connection) -> None:
+        connection.enabled = False
+        self.connection_map[connection.second] = [node for node in self.connection_map[connection.second] if node != connection.first]
+        self.invalidate_network()
 
 
     def create_connection_map(self):
+        # The source nodes of every node's enabled incoming connections. Weights
+        # live only on the connections, so weight mutations can't make this stale.
         self.connection_map = {x: [] for x in self.get_node_list()}
         for connection in self.connections:
             if connection.enabled:
-                self.connection_map[connection.second].append((connection.first, connection.weight))
+                self.connection_map[connection.second].append(connection.first)
+        self.invalidate_network()
+
+    def get_activation(self, node: int) -> str:
+        return self.node_activations.get(node, activations.DEFAULT_ACTIVATION)
+
+    def set_activation(self, node: int, name: str) -> None:
+        activations.get_activation_id(name)
+        if name == activations.DEFAULT_ACTIVATION:
+            self.node_activations.pop(node, None)
+        else:
+            self.node_activations[node] = name
+        self.invalidate_network()
+
+    def get_network(self) -> Network:
+        if self.network is None:
+            self.network = Network.from_genome(self)
+        return self.network
+
+    def get_recurrent_network(self) -> RecurrentNetwork:
+        """
+        Returns the cached recurrent network of this genome, which also works
+        for genomes with cycles. Call reset on it before each episode.
+        """
+        if self.recurrent_network is None:
+            self.recurrent_network = RecurrentNetwork(self)
+        return self.recurrent_network
+
+    def invalidate_network(self) -> None:
+        # Must be called whenever the connections or their weights change.
+        self.network = None
+        self.recurrent_network = None
+        self.gene_arrays = None
+        self.version += 1
+
+    def get_gene_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the innovation ids in ascending order and the matching weights
+        as arrays, for vectorized comparisons between genomes.
+        """
+        if self.gene_arrays is None:
+            self.gene_arrays = (
+                np.array(self.innovations, dtype=np.int64),
+                np.array([self.connection_index[innovation_id].weight for innovation_id in self.innovations], dtype=np.float64),
+            )
+        return self.gene_arrays
 
     def get_connection_weight(self, connection: Connection):
-        if connection in self.connections:
-            for con in self.connections:
-                if connection == con:
-                    return con.weight
-        return None
+        con = self.connection_index.get(connection.innovation_id)
+        return None if con is None else con.weight
     
     def get_connection_enabled(self, connection: Connection):
-        return any(con.enabled and con == connection for con in self.connections)
+        con = self.connection_index.get(connection.innovation_id)
+        return con is not None and con.enabled
 
     def get_connection(self, connection: Connection):
-        for con in self.connections:
-            if con == connection:
-                return con
-        return None
+        return self.connection_index.get(connection.innovation_id)
+
+    def get_sorted_connections(self) -> list[Connection]:
+        return [self.connection_index[innovation_id] for innovation_id in self.innovations]
 
 
     def feed_forward(self, inputs: list[float]) -> list[float]:
-        
-        def get_result(node):
-            if node in self.nodes["inputs"]:
-                return inputs[node - 1]
-            else:
-                if node not in self.connection_map:
-                    return 0
-                else:
-                    return activations.neat_sigmoid(sum(get_result(in_node) * weight for in_node, weight in self.connection_map[node]))
-
-        results = []
-
-        for output in self.nodes["outputs"]:
-            results.append(get_result(output))
-        
-        return results
+        """
+        Evaluates the genome. A recurrent genome advances its recurrent
+        network by one step, so it keeps state between calls until reset.
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if self.recurrent:
+            return self.get_recurrent_network().step(inputs).tolist()
+        return self.get_network().activate(inputs).tolist()
+
+    def reset(self) -> None:
+        """
+        Clears the state of a recurrent genome, e.g. at the start of an episode.
+        """
+        if self.recurrent_network is not None:
+            self.recurrent_network.reset()
     
+    def copy(self) -> "Genome":
+        genome = Genome(self.num_inputs, self.num_outputs, set(con.copy() for con in self.connections))
+        genome.node_activations = dict(self.node_activations)
+        genome.recurrent = self.recurrent
+        genome.fitness = self.fitness
+        return genome
+
+    def serialize(self) -> tuple:
+        """
+        Returns a compact, picklable representation of this genome that can be
+        turned back into a genome with Genome.deserialize.
+        """
+        genes = [(con.first, con.second, con.weight, con.enabled, con.innovation_id) for con in self.connections]
+        return self.num_inputs, self.num_outputs, genes, dict(self.node_activations), self.recurrent
+
+    @staticmethod
+    def deserialize(data: tuple) -> "Genome":
+        num_inputs, num_outputs, genes, node_activations, recurrent = data
+        genome = Genome(num_inputs, num_outputs, set(Connection(*gene) for gene in genes))
+        genome.node_activations = node_activations
+        genome.recurrent = recurrent
+        return genome
+
     def get_node_list(self) -> list[int]:
         return [y for x in self.nodes.values() for y in x]
\ No newline at end of file
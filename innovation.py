@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+
+from connection import Connection
+from genome import Genome
+
+
+class IdAllocator:
+    def __init__(self, start: int, block_size: int = 64) -> None:
+        """
+        Hands out unique, increasing ids from a counter in shared memory.
+        Ids are reserved in blocks, so the counter's lock is taken once per
+        block rather than once per id, and every process copying this
+        allocator draws from its own blocks.
+
+        Like the counter, an allocator can only be shared with a process when
+        the process is started, e.g. as an argument of multiprocessing.Process
+        or in the initargs of a ProcessPoolExecutor. It can't be sent to a
+        running worker, such as in an argument of ProcessPoolExecutor.submit.
+
+        start: The first id to hand out.
+        block_size(optional): How many ids to reserve at a time.
+        """
+        self.counter = multiprocessing.Value("q", start)
+        self.block_size = block_size
+        self.next_id = 0
+        self.block_end = 0
+        self.block_pid = os.getpid()
+
+    def __getstate__(self) -> dict:
+        if multiprocessing.context.get_spawning_popen() is None:
+            raise RuntimeError(
+                "An IdAllocator can only be shared with a process when it is started, "
+                "e.g. through the initargs of a ProcessPoolExecutor, not sent to a running worker."
+            )
+        # A copy sent to another process must not reuse this process's block.
+        return dict(self.__dict__, next_id=0, block_end=0)
+
+    def next(self) -> int:
+        if self.next_id == self.block_end or self.block_pid != os.getpid():
+            with self.counter.get_lock():
+                self.next_id = self.counter.value
+                self.counter.value += self.block_size
+            self.block_end = self.next_id + self.block_size
+            self.block_pid = os.getpid()
+        self.next_id += 1
+        return self.next_id - 1
+
+    def reserve_up_to(self, last_id: int) -> None:
+        """
+        Makes sure no id up to and including last_id is handed out.
+        """
+        with self.counter.get_lock():
+            self.counter.value = max(self.counter.value, last_id + 1)
+        if self.next_id <= last_id:
+            self.next_id = self.block_end = 0
+
+    def get_state(self) -> list[int]:
+        return [self.counter.value, self.next_id, self.block_end]
+
+    def set_state(self, state: list[int]) -> None:
+        self.counter.value, self.next_id, self.block_end = state
+        self.block_pid = os.getpid()
+
+
+class InnovationTracker:
+    def __init__(self, first_node: int, block_size: int = 64) -> None:
+        """
+        Assigns innovation ids to new connections and node ids to split
+        connections. The same structural mutation always gets the same id
+        within a process, and ids are unique across every process sharing the
+        tracker's counters, e.g. workers or islands started with a copy of it.
+
+        first_node: The first id to give a hidden node, i.e. num_inputs + num_outputs + 1.
+        block_size(optional): How many ids each process reserves at a time.
+        """
+        self.innovation_ids = IdAllocator(1, block_size)
+        self.node_ids = IdAllocator(first_node, block_size)
+        # The innovation id of every connection, by (first, second) node.
+        self.connections: dict[tuple[int, int], int] = {}
+        # The hidden node created by splitting a connection, by innovation id.
+        self.split_nodes: dict[int, int] = {}
+        # Innovations created since the last call to new_generation.
+        self.generation_connections: dict[tuple[int, int], int] = {}
+
+    def get_innovation(self, first: int, second: int) -> int:
+        key = (first, second)
+        if key not in self.connections:
+            self.connections[key] = self.innovation_ids.next()
+            self.generation_connections[key] = self.connections[key]
+        return self.connections[key]
+
+    def get_split_node(self, innovation_id: int) -> int:
+        if innovation_id not in self.split_nodes:
+            self.split_nodes[innovation_id] = self.node_ids.next()
+        return self.split_nodes[innovation_id]
+
+    def new_generation(self) -> dict[tuple[int, int], int]:
+        """
+        Returns the connections created during the last generation and starts
+        a new one. The result can be passed to merge on another tracker.
+        """
+        connections, self.generation_connections = self.generation_connections, {}
+        return connections
+
+    def merge(self, connections: dict[tuple[int, int], int]) -> dict[int, int]:
+        """
+        Adds connections created by another tracker. When both created the
+        same connection independently, this tracker's id wins, and the returned
+        mapping from the other tracker's ids to ours can be applied with
+        remap_genome.
+        """
+        remap = {}
+        for key, innovation_id in connections.items():
+            existing = self.connections.setdefault(key, innovation_id)
+            if existing != innovation_id:
+                remap[innovation_id] = existing
+        return remap
+
+
+def remap_genome(genome: Genome, remap: dict[int, int]) -> Genome:
+    """
+    Returns a copy of genome with its innovation ids replaced as returned by
+    InnovationTracker.merge.
+    """
+    connections = set(
+        Connection(con.first, con.second, con.weight, con.enabled, remap.get(con.innovation_id, con.innovation_id))
+        for con in genome.connections
+    )
+    remapped = Genome(genome.num_inputs, genome.num_outputs, connections)
+    remapped.node_activations = dict(genome.node_activations)
+    remapped.recurrent = genome.recurrent
+    remapped.fitness = genome.fitness
+    return remapped
@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+import queue
+import traceback
+from typing import Callable, Optional
+
+from genome import Genome
+from innovation import InnovationTracker, remap_genome
+from neat import Neat
+from rng import RNG
+
+
+def run_islands(
+    num_islands: int,
+    num_inputs: int,
+    num_outputs: int,
+    population_size: int,
+    fitness_function: Callable,
+    generations: int,
+    migration_interval: int = 5,
+    migrants: int = 2,
+    seed: Optional[int] = None,
+    **kwargs,
+) -> list[Genome]:
+    """
+    Evolves num_islands independent populations, each in its own process.
+    Every migration_interval generations each island sends copies of its best
+    migrants genomes to the next island in a ring, where they replace the
+    newest offspring. All islands share one innovation tracker, so migrated
+    genomes can still cross over with the local population.
+
+    num_islands: The number of populations, and processes.
+    num_inputs, num_outputs, population_size, fitness_function: Passed to every island's Neat.
+    generations: How many generations every island evolves.
+    migration_interval(optional): How many generations pass between migrations.
+    migrants(optional): How many genomes every island sends per migration.
+    seed(optional): Seeds the run. Every island draws from its own stream spawned from this seed.
+    kwargs: Any other arguments for Neat.
+
+    Returns the best genome of every island. If any island fails, the others
+    are stopped and a RuntimeError with every island's error is raised.
+    """
+    innovations = InnovationTracker(num_inputs + num_outputs + 1)
+    streams = RNG(seed, kwargs.pop("probabilities", None)).spawn(num_islands)
+    queues = [multiprocessing.Queue() for _ in range(num_islands)]
+    results = multiprocessing.Queue()
+    # Set when an island fails, so the others stop waiting for its migrants.
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=_run_island, args=(
+            i, innovations, queues[i], queues[(i + 1) % num_islands], results, stop,
+            (num_inputs, num_outputs, population_size, fitness_function),
+            dict(kwargs, rng=streams[i]),
+            generations, migration_interval, migrants,
+        ))
+        for i in range(num_islands)
+    ]
+    for process in processes:
+        process.start()
+
+    best = {}
+    errors = {}
+    while len(best) + len(errors) < num_islands:
+        try:
+            index, result, error = results.get(timeout=1)
+        except queue.Empty:
+            # An island that died without reporting, e.g. killed, would otherwise be waited for forever.
+            for index, process in enumerate(processes):
+                if index not in best and index not in errors and process.exitcode is not None:
+                    errors[index] = f"Island {index} exited with code {process.exitcode}."
+                    stop.set()
+            continue
+        if error is None:
+            best[index] = result
+        else:
+            errors[index] = error
+            stop.set()
+    for process in processes:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+    if errors:
+        raise RuntimeError("\n".join(errors[index] for index in sorted(errors)))
+
+    genomes = []
+    for i in range(num_islands):
+        data, fitness = best[i]
+        genome = Genome.deserialize(data)
+        genome.fitness = fitness
+        genomes.append(genome)
+    return genomes
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _run_island(
+    index: int,
+    innovations: InnovationTracker,
+    inbox,
+    outbox,
+    results,
+    stop,
+    args: tuple,
+    kwargs: dict,
+    generations: int,
+    migration_interval: int,
+    migrants: int,
+) -> None:
+    neat = None
+
+    async def evolve():
+        for generation in range(1, generations + 1):
+            await neat.create_generation()
+            if generation % migration_interval == 0 and generation < generations:
+                evaluated = sorted((genome for species in neat.species for genome in species.genomes), key=lambda genome: genome.fitness)
+                outbox.put([genome.serialize() for genome in evaluated[-migrants:]])
+                _receive_migrants(neat, _wait_for_migrants(inbox, stop))
+
+    try:
+        neat = Neat(*args, innovations=innovations, **kwargs)
+        asyncio.run(evolve())
+        results.put((index, (neat.best_genome.serialize(), neat.best_genome.fitness), None))
+    except _Stopped:
+        # Migrants sent to a failed island are never read, so don't wait for them to be flushed.
+        outbox.cancel_join_thread()
+        results.put((index, None, f"Island {index} stopped because another island failed."))
+    except Exception:
+        stop.set()
+        outbox.cancel_join_thread()
+        results.put((index, None, f"Island {index} failed:\n{traceback.format_exc()}"))
+    finally:
+        if neat is not None:
+            neat.close()
+
+
+def _wait_for_migrants(inbox, stop) -> list[tuple]:
+    while True:
+        try:
+            return inbox.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def _receive_migrants(neat: Neat, migrants: list[tuple]) -> None:
+    for i, data in enumerate(migrants, start=1):
+        genome = Genome.deserialize(data)
+        # The same connection may have been created independently on both islands.
+        remap = neat.innovations.merge({(con.first, con.second): con.innovation_id for con in genome.connections})
+        if remap:
+            genome = remap_genome(genome, remap)
+        if i <= len(neat.population):
+            neat.population[-i] = genome
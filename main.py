@@ -1,13 +1,15 @@
 import asyncio
-import gym
 import random
 
 from neat import Neat
 from genome import Genome
 
 async def run_gym(genome: Genome, should_render=False):
+    import gym
+
     env = gym.make("CartPole-v0")
     env.reset()
+    genome.reset()
     fitness = 0.0
     observation, reward, done, info = env.step(env.action_space.sample())
     
@@ -0,0 +1,85 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from genome import Genome
+from species import Species
+
+
+class PhaseTimer:
+    """
+    Accumulates the wall time spent in each named phase of a generation.
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def generation_metrics(
+    generation: int,
+    population: list[Genome],
+    species: list[Species],
+    timings: dict[str, float],
+    evaluations: Optional[int] = None,
+) -> dict:
+    """
+    Summarizes an evaluated generation: species counts and sizes, fitness,
+    the distribution of genome sizes, how much the compiled networks were
+    simplified and the time spent in each phase. Only genomes whose network
+    was compiled in this process, e.g. not by a process evaluator, count
+    towards the simplification. evaluations is how many genomes the fitness
+    function was called on, e.g. fewer than the population when fitness
+    values were cached, and defaults to the whole population.
+    """
+    fitness = [genome.fitness for genome in population]
+    sizes = sorted(len(genome.connections) for genome in population)
+    fitness_time = timings.get("fitness", 0.0)
+    evaluations = len(population) if evaluations is None else evaluations
+    networks = [genome.network for genome in population if genome.network is not None]
+    total_connections = sum(len(genome.connections) for genome in population if genome.network is not None)
+    removed_connections = sum(network.removed_connections for network in networks)
+    return {
+        "generation": generation,
+        "population": len(population),
+        "species": len(species),
+        "species_sizes": [len(s.genomes) for s in species],
+        "average_fitness": sum(fitness) / len(fitness) if fitness else 0.0,
+        "best_fitness": max(fitness, default=0.0),
+        "genome_size": {
+            "min": sizes[0] if sizes else 0,
+            "median": sizes[len(sizes) // 2] if sizes else 0,
+            "mean": sum(sizes) / len(sizes) if sizes else 0.0,
+            "max": sizes[-1] if sizes else 0,
+        },
+        "simplification": {
+            "networks": len(networks),
+            "mean_removed_nodes": sum(network.removed_nodes for network in networks) / len(networks) if networks else 0.0,
+            "mean_removed_connections": removed_connections / len(networks) if networks else 0.0,
+            "removed_connection_fraction": removed_connections / total_connections if total_connections else 0.0,
+        },
+        "evaluations": evaluations,
+        "evaluations_per_second": evaluations / fitness_time if fitness_time > 0 else None,
+        "timings": dict(timings, total=sum(timings.values())),
+    }
+
+
+class JsonLinesWriter:
+    """
+    A metrics hook that appends every generation's metrics to a JSON-lines file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, metrics: dict) -> None:
+        with open(self.path, "a") as file:
+            file.write(json.dumps(metrics) + "\n")
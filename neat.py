@@ -1,196 +1,493 @@
 import math
-import random
 import config
-import asyncio
+import numpy as np
+import network
+import activations
 
 from connection import Connection
-from typing import Callable, Tuple
+from evaluator import create_evaluator
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
 from genome import Genome
 from rng import RNG
-from species import Species
+from concurrent.futures import ProcessPoolExecutor
+from species import Species, distance_matrix
+from checkpoint import read_checkpoint, write_checkpoint
+from metrics import JsonLinesWriter, PhaseTimer, generation_metrics
+from innovation import InnovationTracker
+from pool import GenomePool
+from fitness_cache import FitnessCache
+import species as speciation
 
 
 class Neat:
 
-    innovation_number = 1
-
-    # A list of connections and their respective innovation numbers.
-    paired_nodes = {Tuple: int}
-
     def __init__(
         self,
         num_inputs: int,
         num_outputs: int,
         population_size: int,
         fitness_function: Callable=lambda x: x,
+        evaluator: Union[str, Any] = "async",
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        speciation_workers: Optional[int] = None,
+        checkpoint_every: int = 0,
+        checkpoint_path: str = "checkpoint.npz",
+        metrics_path: Optional[str] = None,
+        recurrent: bool = False,
+        innovations: Optional[InnovationTracker] = None,
+        recycle_genomes: bool = False,
+        fitness_cache: Optional[FitnessCache] = None,
+        probabilities: Optional[dict[str, float]] = None,
+        rng: Optional[RNG] = None,
     ) -> None:
+        """
+        num_inputs: The number of inputs of every genome.
+        num_outputs: The number of outputs of every genome.
+        population_size: The number of genomes in each generation.
+        fitness_function(optional): Called with each genome to set its fitness.
+        evaluator(optional): How fitness functions are run: "async", "thread", "process", or an evaluator object such as rollout.RolloutEvaluator.
+        workers(optional): The number of workers for the thread and process evaluators.
+        seed(optional): Seeds every random decision of the run.
+        probabilities(optional): Overrides the mutation and crossover probabilities, see RNG.set_probabilities.
+        speciation_workers(optional): If set, distances to the species representatives are computed on a process pool of this size.
+        checkpoint_every(optional): If set, the run is saved to checkpoint_path every this many generations.
+        checkpoint_path(optional): Where checkpoint_every saves the run.
+        metrics_path(optional): If set, every generation's metrics are appended to this JSON-lines file.
+        recurrent(optional): Allows connections that create cycles. Genome.feed_forward then steps each genome's recurrent network, so fitness functions must call Genome.reset at the start of every episode.
+        innovations(optional): The innovation tracker to use, e.g. one shared with other processes. A new one is created by default.
+        recycle_genomes(optional): Reuses the genomes of old generations for offspring. Genomes from earlier generations must then not be kept, except the best genome.
+        fitness_cache(optional): If set, genomes whose network was already evaluated reuse the cached fitness.
+        rng(optional): The random generator to use instead of one seeded with seed, e.g. one spawned for a worker process.
+        """
         self.num_inputs = num_inputs
         self.num_outputs = num_outputs
         self.population_size = population_size
-        self.population = [self.mutate(Genome(num_inputs, num_outputs)) for _ in range(self.population_size)]
-        self.best_genome = self.population[0]
+        self.recurrent = recurrent
+        self.rng = rng or RNG(seed)
+        if probabilities:
+            self.rng.set_probabilities(probabilities)
+        self.innovations = innovations or InnovationTracker(num_inputs + num_outputs + 1)
+        self.pool = GenomePool(num_inputs, num_outputs)
+        self.recycle_genomes = recycle_genomes
+        self.fitness_cache = fitness_cache
+        self.population = self.mutate_population([Genome(num_inputs, num_outputs) for _ in range(self.population_size)])
+        self.best_genome = self.population[0] if self.population else None
         self.fitness_function = fitness_function
         self.species: list[Species] = []
-        
+        self.evaluator = create_evaluator(evaluator, workers)
+        self.speciation_workers = speciation_workers
+        self.speciation_executor = None
+        # Distances keyed by the (id, version) of both genomes.
+        self.distance_cache: dict[tuple, float] = {}
+        self.generation = 0
+        # How many genomes the fitness function was called on in the last calculate_fitness.
+        self.evaluations = 0
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_path = checkpoint_path
+        self.hooks: list[Callable[[dict], None]] = []
+        self.metrics: Optional[dict] = None
+        if metrics_path is not None:
+            self.add_hook(JsonLinesWriter(metrics_path))
+
+
+    def add_hook(self, hook: Callable[[dict], None]) -> None:
+        """
+        Registers a function that is called with the metrics of every
+        generation, see metrics.generation_metrics.
+        """
+        self.hooks.append(hook)
 
 
     async def create_generation(self):
-        # print(f"population size: {len(self.population)}")
-        self.separate_species()
-        await self.calculate_fitness()
+        self.innovations.new_generation()
+        timer = PhaseTimer()
+        with timer.phase("speciation"):
+            self.separate_species()
+        with timer.phase("fitness"):
+            await self.calculate_fitness()
         
-        total_average_fitness = 0.0
         for genome in self.population:
-            total_average_fitness += genome.fitness
             if genome.fitness > self.best_genome.fitness:
                 self.best_genome = genome
-        total_average_fitness /= len(self.population)
+        evaluated_population, evaluated_species = self.population, self.species
 
-        # print(f"total_average_fitness: {total_average_fitness}")
-        
+        with timer.phase("reproduction"):
+            new_population, offspring = self._reproduce()
+        with timer.phase("mutation"):
+            self.population = new_population + self.mutate_population(offspring)
+
+        self.metrics = generation_metrics(self.generation, evaluated_population, evaluated_species, timer.timings, self.evaluations)
+        if self.fitness_cache is not None:
+            self.metrics["fitness_cache"] = self.fitness_cache.stats()
+        for hook in self.hooks:
+            hook(self.metrics)
+        if self.recycle_genomes:
+            keep = self.population + [self.best_genome] + [species.representative for species in self.species]
+            self.pool.swap(evaluated_population, keep)
+        self.generation += 1
+        if self.checkpoint_every and self.generation % self.checkpoint_every == 0:
+            self.save_checkpoint(self.checkpoint_path)
 
+
+    def _reproduce(self) -> Tuple[list[Genome], list[Genome]]:
+        """
+        Returns the elites carried over unchanged and the offspring, not yet
+        mutated, that make up the next generation.
+        """
         new_population = []
-        # print(f"Species: {len(self.species)}")
+        offspring = []
+        surviving_species = []
+        self._allot_offspring()
         for species in self.species:
-            if len(species.genomes) == 0:
-                self.species.remove(species)
-                continue
             species.age += 1
-            species.to_produce = math.floor((total_average_fitness / species.get_average_fitness()) * self.population_size) 
             if species.to_produce == 0: 
-                self.species.remove(species)
                 continue
             genome_pool = species.get_top_of_species()
-            if len(genome_pool) == 0: 
-                self.species.remove(species)
-                continue
+            surviving_species.append(species)
             if len(species.genomes) >= 5:
                 new_population.append(genome_pool[-1])
                 species.to_produce -= 1
             for _ in range(species.to_produce):
-                if RNG.should_mutate_without_crossover():
-                    new_population.append(self.mutate(random.choice(genome_pool)))
+                if self.rng.should_mutate_without_crossover():
+                    offspring.append(self.pool.copy(self.rng.choice(genome_pool)))
                 else:
-                    new_population.append(self.mutate(self.cross_over(random.choice(genome_pool), random.choice(genome_pool))))
+                    offspring.append(self.cross_over(self.rng.choice(genome_pool), self.rng.choice(genome_pool)))
             species.to_produce = 0
 
-        self.population = new_population
+        self.species = surviving_species
+        return new_population, offspring
+
+
+    def _allot_offspring(self) -> None:
+        # Every species gets its share of the population, rounded down, and the
+        # slots left over go to the species with the largest remainders, so
+        # exactly population_size genomes are produced.
+        total_species_fitness = sum(species.get_average_fitness() for species in self.species)
+        quotas = []
+        for species in self.species:
+            if total_species_fitness > 0:
+                share = species.get_average_fitness() / total_species_fitness
+            else:
+                share = 1 / len(self.species)
+            quotas.append(share * self.population_size)
+            species.to_produce = math.floor(quotas[-1])
+        leftover = self.population_size - sum(species.to_produce for species in self.species)
+        by_remainder = sorted(range(len(self.species)), key=lambda i: quotas[i] - self.species[i].to_produce, reverse=True)
+        for i in by_remainder[:leftover]:
+            self.species[i].to_produce += 1
+
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Saves the population, species, innovation registry and random state so
+        the run can be resumed with Neat.load_checkpoint.
+        """
+        genomes = list(self.population)
+        index = {id(genome): i for i, genome in enumerate(genomes)}
+
+        def locate(genome: Genome) -> int:
+            if id(genome) not in index:
+                index[id(genome)] = len(genomes)
+                genomes.append(genome)
+            return index[id(genome)]
+
+        representatives = [locate(species.representative) for species in self.species]
+        best = locate(self.best_genome)
+        pairs = [(*key, value) for key, value in self.innovations.connections.items()]
+        header = {
+            "num_inputs": self.num_inputs,
+            "num_outputs": self.num_outputs,
+            "population_size": self.population_size,
+            "population": len(self.population),
+            "best_genome": best,
+            "generation": self.generation,
+            "innovation_ids": self.innovations.innovation_ids.get_state(),
+            "node_ids": self.innovations.node_ids.get_state(),
+            "target_species_size": config.TARGET_SPECIES_SIZE,
+            "rng_state": self.rng.get_state(),
+        }
+        write_checkpoint(path, header, genomes, {
+            "species_representative": np.array(representatives, dtype=np.int64),
+            "species_age": np.array([species.age for species in self.species], dtype=np.int64),
+            "connection_innovations": np.array(pairs, dtype=np.int64).reshape(-1, 3),
+            "split_nodes": np.array(list(self.innovations.split_nodes.items()), dtype=np.int64).reshape(-1, 2),
+        })
+
+
+    @classmethod
+    def load_checkpoint(cls, path: str, fitness_function: Callable=lambda x: x, **kwargs) -> "Neat":
+        """
+        Resumes a run saved with save_checkpoint. Any other constructor
+        arguments, such as the evaluator, are passed through kwargs. The
+        innovation tracker is restored from the checkpoint, so a shared
+        tracker can't be passed.
+        """
+        if kwargs.get("innovations") is not None:
+            raise ValueError("A checkpoint restores its own innovation tracker, so innovations can't be passed to load_checkpoint.")
+        header, genomes, arrays = read_checkpoint(path)
+        # Created without a population, so no ids or random numbers are drawn before the saved state is restored.
+        neat = cls(header["num_inputs"], header["num_outputs"], 0, fitness_function, **kwargs)
+        neat.population_size = header["population_size"]
+        for genome in genomes:
+            genome.recurrent = neat.recurrent
+        neat.population = genomes[:header["population"]]
+        neat.best_genome = genomes[header["best_genome"]]
+        neat.species = []
+        for representative, age in zip(arrays["species_representative"].tolist(), arrays["species_age"].tolist()):
+            species = Species(genomes[representative])
+            species.age = age
+            neat.species.append(species)
+
+        neat.innovations.connections = {(first, second): innovation for first, second, innovation in arrays["connection_innovations"].tolist()}
+        neat.innovations.split_nodes = dict(arrays["split_nodes"].tolist())
+        neat.innovations.generation_connections = {}
+        neat.innovations.innovation_ids.set_state(header["innovation_ids"])
+        neat.innovations.node_ids.set_state(header["node_ids"])
+        neat.generation = header["generation"]
+        config.TARGET_SPECIES_SIZE = header["target_species_size"]
+        neat.rng.set_state(header["rng_state"])
+        return neat
 
  
     def separate_species(self):
-        self.species = [Species(self.population[0])]
+        """
+        Assigns every genome to the first species whose representative is
+        within the compatibility threshold, creating new species as needed.
+        A species keeps the genome that founded it as its representative for
+        as long as the species lives, so the distances of surviving genomes to
+        the representatives are reused from the previous generation.
+        """
+        for species in self.species:
+            species.genomes = []
+        if self.speciation_workers and self.species:
+            self._calculate_representative_distances()
+
         for genome in self.population:
-            found_species = False
             for species in self.species:
-                random_genome = species.random_genome()
-                distance = self.calculate_distance(genome, random_genome)
-                if distance < config.COMPATABILITY_DISTANCE_THRESHOLD:
+                if self._cached_distance(genome, species.representative) < config.COMPATABILITY_DISTANCE_THRESHOLD:
                     species.add_genome(genome)
-                    found_species = True
                     break
-            if not found_species:
+            else:
                 self.species.append(Species(genome))
 
+        self.species = [species for species in self.species if len(species.genomes) > 0]
+        alive = set(genome.id for genome in self.population)
+        representatives = set(species.representative.id for species in self.species)
+        self.distance_cache = {key: distance for key, distance in self.distance_cache.items() if key[0] in alive and key[2] in representatives}
+
         if len(self.species) is not config.TARGET_SPECIES_SIZE:
             config.TARGET_SPECIES_SIZE += config.THRESHOLD_DELTA * (1 if len(self.species) > config.TARGET_SPECIES_SIZE else -1)
 
 
+    def _cached_distance(self, first: Genome, second: Genome) -> float:
+        key = (first.id, first.version, second.id, second.version)
+        if key not in self.distance_cache:
+            self.distance_cache[key] = self.calculate_distance(first, second)
+        return self.distance_cache[key]
+
+
+    def _calculate_representative_distances(self) -> None:
+        # Fills the cache with the distance between every genome and every current representative on a process pool.
+        if self.speciation_executor is None:
+            self.speciation_executor = ProcessPoolExecutor(self.speciation_workers)
+        representatives = [species.representative for species in self.species]
+        # Genomes that survived from the previous generation already have their distances cached.
+        genomes = [
+            genome for genome in self.population
+            if any((genome.id, genome.version, representative.id, representative.version) not in self.distance_cache for representative in representatives)
+        ]
+        if not genomes:
+            return
+        chunk_size = max(1, math.ceil(len(genomes) / (self.speciation_workers * 4)))
+        chunks = [genomes[i:i + chunk_size] for i in range(0, len(genomes), chunk_size)]
+        representative_genes = [genome.get_gene_arrays() for genome in representatives]
+        results = self.speciation_executor.map(
+            distance_matrix,
+            [[genome.get_gene_arrays() for genome in chunk] for chunk in chunks],
+            [representative_genes] * len(chunks),
+        )
+        for chunk, distances in zip(chunks, results):
+            for genome, row in zip(chunk, distances.tolist()):
+                for representative, distance in zip(representatives, row):
+                    self.distance_cache[(genome.id, genome.version, representative.id, representative.version)] = distance
+
+
     def create_connection(self, node_numbers: Tuple[int, int], weight: float) -> Connection:
-        if tuple(node_numbers) in Neat.paired_nodes.keys():
-            return Connection(*node_numbers, weight, True, Neat.paired_nodes.get(tuple(node_numbers)))
-        else:
-            con = Connection(*node_numbers, weight, True, self.innovation_number)
-            Neat.paired_nodes.update({tuple(node_numbers): self.innovation_number})
-            self.innovation_number += 1
-            return con
+        return self.pool.connection(*node_numbers, weight, True, self.innovations.get_innovation(*node_numbers))
 
 
     async def calculate_fitness(self) -> float:
-        for fitness_function in asyncio.as_completed([self.fitness_function(genome) for genome in self.population]):
-            await fitness_function
+        if self.fitness_cache is None:
+            await self.evaluator.evaluate(self.population, self.fitness_function)
+            self.evaluations = len(self.population)
+            return
+
+        # Identical networks that aren't cached yet are evaluated once.
+        uncached: dict[bytes, list[Genome]] = {}
+        for genome in self.population:
+            key = FitnessCache.key(genome)
+            # Duplicates of a genome that will be evaluated aren't looked up, so misses count real evaluations.
+            if key in uncached:
+                uncached[key].append(genome)
+                continue
+            fitness = self.fitness_cache.get(key, self.generation)
+            if fitness is None:
+                uncached[key] = [genome]
+            else:
+                genome.fitness = fitness
+        await self.evaluator.evaluate([genomes[0] for genomes in uncached.values()], self.fitness_function)
+        self.evaluations = len(uncached)
+        for key, genomes in uncached.items():
+            for genome in genomes[1:]:
+                genome.fitness = genomes[0].fitness
+            self.fitness_cache.put(key, genomes[0].fitness, self.generation)
+
+
+    def close(self) -> None:
+        """
+        Shuts down any worker pools used for fitness evaluation and speciation.
+        """
+        self.evaluator.close()
+        if self.speciation_executor is not None:
+            self.speciation_executor.shutdown()
+            self.speciation_executor = None
+
+
+    def feed_forward_population(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the whole population on a (num_inputs x batch) matrix of
+        inputs, returning a (population x num_outputs x batch) array.
+        """
+        return network.activate_population(self.population, inputs)
 
 
     def calculate_distance(self, first: Genome, second: Genome) -> float:
-        gene_differences = 0
-        weight_differences = 0
-        shared_weights = 0.0
-        genes = first.connections.union(second.connections)
-        for gene in genes:
-            if first.has_connection(gene) ^ second.has_connection(gene):
-                gene_differences += 1
+        return speciation.calculate_distance(first.get_gene_arrays(), second.get_gene_arrays())
+
+
+    def _align_genes(self, first: Genome, second: Genome) -> Iterator[Tuple[Optional[Connection], Optional[Connection]]]:
+        """
+        Walks both genomes' genes in innovation order, yielding matching genes
+        as pairs and disjoint or excess genes paired with None.
+        """
+        first_genes = first.get_sorted_connections()
+        second_genes = second.get_sorted_connections()
+        i = j = 0
+        while i < len(first_genes) and j < len(second_genes):
+            first_id = first_genes[i].innovation_id
+            second_id = second_genes[j].innovation_id
+            if first_id == second_id:
+                yield first_genes[i], second_genes[j]
+                i += 1
+                j += 1
+            elif first_id < second_id:
+                yield first_genes[i], None
+                i += 1
             else:
-                # If the first(or second) genome has the connection, then they
-                # must both have the gene because of the logical XOR.
-                if first.has_connection(gene) and second.has_connection(gene):
-                    weight_differences += (
-                        first.get_connection_weight(gene) + second.get_connection_weight(gene)
-                    )
-                    shared_weights += 1.0
-        return gene_differences + ((config.C3 * (weight_differences / (shared_weights*2))) if shared_weights > 0.0 else 0)
+                yield None, second_genes[j]
+                j += 1
+        for gene in first_genes[i:]:
+            yield gene, None
+        for gene in second_genes[j:]:
+            yield None, gene
 
 
     def cross_over(self, first: Genome, second: Genome) -> Genome:
-        first_fitness = self.calculate_fitness(first)
-        total_fitness = first_fitness + self.calculate_fitness(second)
-        first_inherit_prob = first_fitness / total_fitness
-        genes = first.connections.union(second.connections)
-        new_connections = set(self._determine_gene(first, second, connection, first_inherit_prob) for connection in genes if first.has_connection(connection) or second.has_connection(connection))
-        return Genome(self.num_inputs, self.num_outputs, connections=new_connections)
-
-
-    def _determine_gene(self, first: Genome, second: Genome, connection: Connection, first_inherit_prob: float):
-        connection = None
-        if first.has_connection(connection) and second.has_connection(connection):
-            if RNG.should_inherit_average_weight():
-                connection = self._calculate_connection_enabled(first.get_connection(connection), other_enabled=second.get_connection(connection).enabled)
-                connection.weight = (first.get_connection_weight(connection) + second.get_connection_weight(connection)) / 2.0
-            else: 
-                if random.random() < first_inherit_prob:
-                    connection = self._calculate_connection_enabled(first.get_connection(connection), other_enabled=second.get_connection(connection).enabled)
-                else:
-                    connection = self._calculate_connection_enabled(second.get_connection(connection), other_enabled=first.get_connection(connection).enabled)
-        if first.has_connection(connection):
-            connection = self._calculate_connection_enabled(first.get_connection(connection))
-        if second.has_connection(connection):
-            connection = self._calculate_connection_enabled(second.get_connection(connection))
+        total_fitness = first.fitness + second.fitness
+        first_inherit_prob = first.fitness / total_fitness if total_fitness > 0 else 0.5
+        child = self.pool.genome()
+        for first_gene, second_gene in self._align_genes(first, second):
+            child.add_connection(self._determine_gene(first_gene, second_gene, first_inherit_prob))
+        # Nodes present in both parents inherit either parent's activation.
+        first_nodes, second_nodes = set(first.get_node_list()), set(second.get_node_list())
+        for node in set(first.node_activations) | set(second.node_activations):
+            parents = [parent for parent, nodes in ((first, first_nodes), (second, second_nodes)) if node in nodes]
+            if node in child.connection_map and parents:
+                child.set_activation(node, self.rng.choice(parents).get_activation(node))
+        return child
+
+
+    def _determine_gene(self, first_gene: Optional[Connection], second_gene: Optional[Connection], first_inherit_prob: float) -> Connection:
+        if first_gene is None or second_gene is None:
+            return self._calculate_connection_enabled(first_gene or second_gene)
+        if self.rng.should_inherit_average_weight():
+            connection = self._calculate_connection_enabled(first_gene, other_enabled=second_gene.enabled)
+            connection.weight = (first_gene.weight + second_gene.weight) / 2.0
+        elif self.rng.random() < first_inherit_prob:
+            connection = self._calculate_connection_enabled(first_gene, other_enabled=second_gene.enabled)
+        else:
+            connection = self._calculate_connection_enabled(second_gene, other_enabled=first_gene.enabled)
         return connection
 
 
-    def _calculate_connection_enabled(self, connection: Connection, other_enabled: bool=False) -> Connection:
-        new_connection = connection.copy()
-        new_connection.enabled = (not other_enabled or not connection.enabled) and RNG.should_disabled_connection_be_inherited()
+    def _calculate_connection_enabled(self, connection: Connection, other_enabled: bool=True) -> Connection:
+        # A gene disabled in either parent stays disabled with a fixed probability.
+        new_connection = self.pool.copy_connection(connection)
+        if not (connection.enabled and other_enabled):
+            new_connection.enabled = not self.rng.should_disabled_connection_be_inherited()
         return new_connection
 
 
     def mutate(self, genome: Genome) -> Genome:
-        if RNG.should_weights_change():
-            self._mutate_connections(genome)
-        elif RNG.should_connection_be_added():
-            print('here1')
-            node_list = genome.get_node_list()
-            nodes = random.choices(node_list, k=2)
+        return self.mutate_population([genome])[0]
+
+
+    def mutate_population(self, genomes: list[Genome]) -> list[Genome]:
+        """
+        Mutates every genome in place. The weights of all genomes chosen for a
+        weight change are mutated together in one vectorized operation, every
+        other genome may get a structural mutation.
+        """
+        for genome in genomes:
+            genome.recurrent = self.recurrent
+        change_weights = self.rng.generator.random(len(genomes)) < self.rng.WEIGHT_CHANGE_PROBABILITY
+        self._mutate_weights([genome for genome, change in zip(genomes, change_weights) if change])
+        for genome, change in zip(genomes, change_weights):
+            if not change:
+                self._mutate_structure(genome)
+        return genomes
+
+
+    def _mutate_structure(self, genome: Genome) -> None:
+        if self.rng.should_connection_be_added():
+            node_list = sorted(genome.get_node_list())
+            nodes = self.rng.choices(node_list, k=2)
             
             while not self._is_valid_connection(genome, *nodes):
-                nodes = random.choices(node_list, k=2)
+                nodes = self.rng.choices(node_list, k=2)
 
-            genome.add_connection(self.create_connection(nodes, random.random() * 2 - 1))
-        elif RNG.should_node_be_added():            
+            genome.add_connection(self.create_connection(nodes, self.rng.uniform(-1, 1)))
+        elif self.rng.should_node_be_added():
             if len(genome.connections) == 0: return
-            print('here2')
-            connection_to_split = random.choice(list(genome.connections))
-            connection_to_split.enabled = False
-            genome.add_connection(self.create_connection((connection_to_split.first, max(genome.get_node_list()) + 1), 1.0))
-            genome.add_connection(self.create_connection((max(genome.get_node_list()) + 1, connection_to_split.second), connection_to_split.weight))
-        return genome
-
-
-    def _mutate_connections(self, genome: Genome) -> None:
-        for connection in genome.connections:
-            if RNG.should_weights_be_perturbed():
-                connection.weight += random.gauss(0, 0.1)
-            else:
-                connection.weight = random.random() * 2 - 1
+            connection_to_split = self.rng.choice(genome.get_sorted_connections())
+            new_node = self.innovations.get_split_node(connection_to_split.innovation_id)
+            genome.disable_connection(connection_to_split)
+            genome.add_connection(self.create_connection((connection_to_split.first, new_node), 1.0))
+            genome.add_connection(self.create_connection((new_node, connection_to_split.second), connection_to_split.weight))
+        elif self.rng.should_activation_change():
+            node = self.rng.choice(sorted(genome.nodes["hidden"] | genome.nodes["outputs"]))
+            genome.set_activation(node, self.rng.choice(activations.ACTIVATION_NAMES))
+
+
+    def _mutate_weights(self, genomes: list[Genome]) -> None:
+        # Each weight is perturbed with Gaussian noise or replaced by a uniform value in [-1, 1).
+        connections = [connection for genome in genomes for connection in genome.get_sorted_connections()]
+        weights = np.fromiter((connection.weight for connection in connections), dtype=np.float64, count=len(connections))
+        generator = self.rng.generator
+        perturb = generator.random(len(connections)) < self.rng.NORMAL_WEIGHT_CHANGE_PROBABILITY
+        weights = np.where(
+            perturb,
+            weights + generator.normal(0, 0.1, len(connections)),
+            generator.random(len(connections)) * 2 - 1,
+        )
+        for connection, weight in zip(connections, weights.tolist()):
+            connection.weight = weight
+        for genome in genomes:
+            genome.invalidate_network()
             
 
     def _is_valid_connection(self, genome: Genome, first_node: int, second_node: int):
+        if self.recurrent:
+            return second_node not in genome.nodes["inputs"]
         return (first_node != second_node) and ((first_node in genome.nodes["inputs"] and (second_node in genome.nodes["hidden"] or second_node in genome.nodes["outputs"])) or (first_node in genome.nodes["hidden"] and second_node in genome.nodes["outputs"]))
\ No newline at end of file
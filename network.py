@@ -0,0 +1,396 @@
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+import activations
+
+if TYPE_CHECKING:
+    from genome import Genome
+
+
+class Network:
+    def __init__(
+        self,
+        num_inputs: int,
+        depths: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        weight: np.ndarray,
+        outputs: np.ndarray,
+        activation: Optional[np.ndarray] = None,
+        bias: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        A compiled, array-backed phenotype. Nodes are stored in topological
+        order, grouped into layers of equal depth, and every connection is a
+        (source index, destination index, weight) triple in flat arrays sorted
+        by destination, so evaluation is a short loop over layers.
+
+        num_inputs: The number of input nodes, which must be the first num_inputs node indices.
+        depths: The depth of every node. Inputs have depth 0, every other node at least 1.
+        src: The source node index of every connection.
+        dst: The destination node index of every connection.
+        weight: The weight of every connection.
+        outputs: The node indices whose values are returned by activate.
+        activation(optional): The id of every node's activation function, see activations.ACTIVATIONS. Defaults to sigmoid.
+        bias(optional): A constant added to every node's weighted sum. Defaults to 0.
+        """
+        depths = np.asarray(depths, dtype=np.int64)
+        order = np.argsort(depths, kind="stable")
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+
+        src = position[np.asarray(src, dtype=np.int64)]
+        dst = position[np.asarray(dst, dtype=np.int64)]
+        edge_order = np.argsort(dst, kind="stable")
+
+        self.num_inputs = num_inputs
+        self.num_nodes = len(order)
+        self.depths = depths[order]
+        self.src = src[edge_order]
+        self.dst = dst[edge_order]
+        self.weight = np.asarray(weight, dtype=np.float64)[edge_order]
+        self.outputs = position[np.asarray(outputs, dtype=np.int64)]
+        if activation is None:
+            activation = np.full(len(order), activations.get_activation_id(activations.DEFAULT_ACTIVATION))
+        self.activation = np.asarray(activation, dtype=np.int8)[order]
+        self.bias = np.zeros(len(order)) if bias is None else np.asarray(bias, dtype=np.float64)[order]
+        self.removed_nodes = 0
+        self.removed_connections = 0
+
+        self.layers = []
+        bounds = np.searchsorted(self.depths, np.arange(1, self.depths[-1] + 2)) if self.num_nodes > num_inputs else []
+        for n0, n1 in zip(bounds[:-1], bounds[1:]):
+            e0, e1 = np.searchsorted(self.dst, (n0, n1))
+            targets, starts = np.unique(self.dst[e0:e1], return_index=True)
+            bias = self.bias[n0:n1] if self.bias[n0:n1].any() else None
+            self.layers.append((n0, n1, e0, e1, starts, targets - n0, bias, self._group_activations(n0, n1)))
+
+    def _group_activations(self, n0: int, n1: int) -> list[tuple]:
+        # Groups a layer's nodes by activation function so each function is applied once per layer.
+        ids = self.activation[n0:n1]
+        unique_ids = np.unique(ids)
+        if len(unique_ids) == 1:
+            return [(activations.ACTIVATION_FUNCTIONS[unique_ids[0]], slice(None))]
+        return [(activations.ACTIVATION_FUNCTIONS[i], np.flatnonzero(ids == i)) for i in unique_ids]
+
+    @classmethod
+    def from_genome(cls, genome: "Genome") -> "Network":
+        """
+        Compiles the simplified phenotype of genome. Disabled connections and
+        hidden nodes that can't reach an output are dropped. Nodes that no
+        input reaches always have the same value, so they are evaluated once
+        here and their contributions are folded into the bias of the nodes
+        they feed. removed_nodes and removed_connections count what was left out.
+        """
+        inputs = sorted(genome.nodes["inputs"])
+        outputs = sorted(genome.nodes["outputs"])
+        edges = [
+            (con.first, con.second, con.weight)
+            for con in genome.connections
+            if con.enabled and con.second not in genome.nodes["inputs"]
+        ]
+        nodes = set(genome.get_node_list())
+        nodes.update(node for first, second, _ in edges for node in (first, second))
+        node_activations = {node: genome.get_activation(node) for node in nodes}
+        nodes, edges, bias = _simplify(inputs, outputs, nodes, edges, node_activations)
+        depths = _node_depths(inputs, nodes, edges)
+
+        node_ids = inputs + sorted(nodes - set(inputs))
+        index = {node: i for i, node in enumerate(node_ids)}
+        network = cls(
+            len(inputs),
+            [depths[node] for node in node_ids],
+            [index[first] for first, _, _ in edges],
+            [index[second] for _, second, _ in edges],
+            [weight for _, _, weight in edges],
+            [index[node] for node in outputs],
+            [activations.get_activation_id(node_activations[node]) for node in node_ids],
+            [bias.get(node, 0.0) for node in node_ids],
+        )
+        network.removed_nodes = len(node_activations) - len(node_ids)
+        network.removed_connections = len(genome.connections) - len(edges)
+        return network
+
+    @classmethod
+    def combine(cls, networks: list["Network"], shared_inputs: bool = True) -> "Network":
+        """
+        Packs several networks with the same number of inputs into one
+        block-sparse network. Layer k of the result holds layer k of every
+        network, so all of them are evaluated with one pass over the deepest
+        network's layers. The outputs of the combined network are the outputs
+        of each network, concatenated.
+
+        networks: The networks to combine.
+        shared_inputs(optional): Whether all networks read the same inputs. Otherwise the
+            combined network takes every network's inputs, concatenated.
+        """
+        num_inputs = networks[0].num_inputs
+        total_inputs = num_inputs if shared_inputs else num_inputs * len(networks)
+        depths = [np.zeros(total_inputs, dtype=np.int64)]
+        # Inputs are never activated, so their activation id doesn't matter.
+        activation = [np.zeros(total_inputs, dtype=np.int8)]
+        bias = [np.zeros(total_inputs)]
+        src, dst, weight, outputs = [], [], [], []
+        offset = total_inputs
+        for i, network in enumerate(networks):
+            if network.num_inputs != num_inputs:
+                raise ValueError("All networks must have the same number of inputs to be combined.")
+            # Inputs move to their shared or own index, every other node past the previous networks.
+            shift = np.full(network.num_nodes, offset - num_inputs, dtype=np.int64)
+            shift[:num_inputs] = 0 if shared_inputs else i * num_inputs
+            depths.append(network.depths[num_inputs:])
+            activation.append(network.activation[num_inputs:])
+            bias.append(network.bias[num_inputs:])
+            src.append(network.src + shift[network.src])
+            dst.append(network.dst + shift[network.dst])
+            weight.append(network.weight)
+            outputs.append(network.outputs + shift[network.outputs])
+            offset += network.num_nodes - num_inputs
+        return cls(
+            total_inputs,
+            np.concatenate(depths),
+            np.concatenate(src),
+            np.concatenate(dst),
+            np.concatenate(weight),
+            np.concatenate(outputs),
+            np.concatenate(activation),
+            np.concatenate(bias),
+        )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """
+        The compiled layout as flat arrays, including the layer table, which
+        from_arrays turns back into a network without reordering anything.
+        Every layer is a row (n0, n1, e0, e1, t0, t1, g0, g1, has_bias) of
+        layer_table: its nodes n0:n1, its connections e0:e1, its targets and
+        reduce starts t0:t1, and its activation groups g0:g1, which are rows
+        (activation id, i0, i1) of group_table over group_nodes.
+        """
+        layer_table, group_table, starts, targets, group_nodes = [], [], [], [], []
+        num_targets = num_group_nodes = 0
+        for n0, n1, e0, e1, layer_starts, layer_targets, bias, groups in self.layers:
+            layer_table.append((
+                n0, n1, e0, e1, num_targets, num_targets + len(layer_targets),
+                len(group_table), len(group_table) + len(groups), bias is not None,
+            ))
+            starts.append(layer_starts)
+            targets.append(layer_targets)
+            num_targets += len(layer_targets)
+            for _, nodes in groups:
+                nodes = np.arange(n1 - n0) if isinstance(nodes, slice) else nodes
+                group_table.append((self.activation[n0 + nodes[0]], num_group_nodes, num_group_nodes + len(nodes)))
+                group_nodes.append(nodes)
+                num_group_nodes += len(nodes)
+        return {
+            "depths": self.depths,
+            "src": self.src,
+            "dst": self.dst,
+            "weight": self.weight,
+            "bias": self.bias,
+            "activation": self.activation,
+            "outputs": self.outputs,
+            "layer_table": np.array(layer_table, dtype=np.int64).reshape(-1, 9),
+            "group_table": np.array(group_table, dtype=np.int64).reshape(-1, 3),
+            "starts": np.concatenate(starts).astype(np.int64) if starts else np.empty(0, dtype=np.int64),
+            "targets": np.concatenate(targets).astype(np.int64) if targets else np.empty(0, dtype=np.int64),
+            "group_nodes": np.concatenate(group_nodes).astype(np.int64) if group_nodes else np.empty(0, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, num_inputs: int, arrays: dict[str, np.ndarray]) -> "Network":
+        """
+        Rebuilds a network from the arrays returned by to_arrays. The arrays
+        are used as they are, e.g. memory-mapped, and nothing is sorted or
+        recomputed.
+        """
+        network = cls.__new__(cls)
+        network.num_inputs = num_inputs
+        network.num_nodes = len(arrays["depths"])
+        for name in ("depths", "src", "dst", "weight", "bias", "activation", "outputs"):
+            setattr(network, name, arrays[name])
+        network.removed_nodes = 0
+        network.removed_connections = 0
+
+        group_table = arrays["group_table"].tolist()
+        network.layers = []
+        for n0, n1, e0, e1, t0, t1, g0, g1, has_bias in arrays["layer_table"].tolist():
+            groups = [
+                (activations.ACTIVATION_FUNCTIONS[activation_id], slice(None) if g1 - g0 == 1 else arrays["group_nodes"][i0:i1])
+                for activation_id, i0, i1 in group_table[g0:g1]
+            ]
+            bias = network.bias[n0:n1] if has_bias else None
+            network.layers.append((n0, n1, e0, e1, arrays["starts"][t0:t1], arrays["targets"][t0:t1], bias, groups))
+        return network
+
+    def activate(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the network. inputs is either a vector of num_inputs values
+        or a (num_inputs x batch) matrix, in which case every column is
+        evaluated at once and a (num_outputs x batch) matrix is returned.
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        values = np.empty((self.num_nodes,) + inputs.shape[1:])
+        values[: self.num_inputs] = inputs
+        for n0, n1, e0, e1, starts, targets, bias, groups in self.layers:
+            sums = np.zeros((n1 - n0,) + values.shape[1:])
+            if e1 > e0:
+                weight = self.weight[e0:e1] if values.ndim == 1 else self.weight[e0:e1, None]
+                sums[targets] = np.add.reduceat(values[self.src[e0:e1]] * weight, starts)
+            if bias is not None:
+                sums += bias if values.ndim == 1 else bias[:, None]
+            layer = values[n0:n1]
+            for function, nodes in groups:
+                layer[nodes] = function(sums[nodes])
+        return values[self.outputs]
+
+
+class RecurrentNetwork:
+    def __init__(self, genome: "Genome") -> None:
+        """
+        A compiled phenotype for genomes that may contain cycles. Every call
+        to step advances all nodes by one time step from the previous step's
+        values, which are kept in preallocated arrays, so stepping does not
+        allocate.
+
+        genome: The genome to compile.
+        """
+        inputs = sorted(genome.nodes["inputs"])
+        input_set = set(inputs)
+        edges = [(con.first, con.second, con.weight) for con in genome.connections if con.enabled and con.second not in input_set]
+        nodes = set(genome.get_node_list())
+        nodes.update(node for first, second, _ in edges for node in (first, second))
+
+        # Non-input nodes are ordered by activation, so every activation is applied to one contiguous slice.
+        activation_ids = {node: activations.get_activation_id(genome.get_activation(node)) for node in nodes - input_set}
+        node_ids = inputs + sorted(nodes - input_set, key=lambda node: (activation_ids[node], node))
+        index = {node: i for i, node in enumerate(node_ids)}
+
+        self.num_inputs = len(inputs)
+        self.weights = np.zeros((len(node_ids) - self.num_inputs, len(node_ids)))
+        for first, second, weight in edges:
+            self.weights[index[second] - self.num_inputs, index[first]] += weight
+        self.outputs = np.array([index[node] for node in sorted(genome.nodes["outputs"])], dtype=np.int64)
+
+        self.groups = []
+        ordered_ids = [activation_ids[node] for node in node_ids[self.num_inputs:]]
+        start = 0
+        for end in range(1, len(ordered_ids) + 1):
+            if end == len(ordered_ids) or ordered_ids[end] != ordered_ids[start]:
+                self.groups.append((activations.ACTIVATION_FUNCTIONS[ordered_ids[start]], slice(start, end)))
+                start = end
+
+        self.values = np.zeros(len(node_ids))
+        # The input values, a view into values that step can also read from directly.
+        self.inputs = self.values[: self.num_inputs]
+        self.sums = np.zeros(len(node_ids) - self.num_inputs)
+        self.output_values = np.zeros(len(self.outputs))
+
+    def reset(self) -> None:
+        """
+        Clears the activation state, e.g. at the start of an episode.
+        """
+        self.values.fill(0.0)
+
+    def step(self, inputs: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Advances the network by one time step. inputs should be an ndarray of
+        num_inputs values, or None if they were already written to
+        self.inputs. The returned array is reused by the next call, copy it to
+        keep it.
+        """
+        if inputs is not None:
+            np.copyto(self.inputs, inputs)
+        np.dot(self.weights, self.values, out=self.sums)
+        hidden = self.values[self.num_inputs:]
+        for function, nodes in self.groups:
+            function(self.sums[nodes], out=hidden[nodes])
+        return np.take(self.values, self.outputs, out=self.output_values)
+
+
+def activate_population(genomes: list["Genome"], inputs: np.ndarray) -> np.ndarray:
+    """
+    Evaluates every genome on the same inputs in one vectorized pass.
+
+    genomes: The genomes to evaluate, all with the same number of inputs and outputs.
+    inputs: A (num_inputs x batch) matrix, or a single input vector.
+
+    Returns an array of shape (len(genomes), num_outputs, batch), or
+    (len(genomes), num_outputs) for a single input vector.
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    network = Network.combine([genome.get_network() for genome in genomes])
+    return network.activate(inputs).reshape((len(genomes), -1) + inputs.shape[1:])
+
+
+def _simplify(
+    inputs: list[int],
+    outputs: list[int],
+    nodes: set[int],
+    edges: list[tuple[int, int, float]],
+    node_activations: dict[int, str],
+) -> tuple[set[int], list[tuple[int, int, float]], dict[int, float]]:
+    # Returns the nodes and edges that are kept and the bias of every node fed by a dropped constant node.
+    incoming = {node: [] for node in nodes}
+    outgoing = {node: [] for node in nodes}
+    for first, second, weight in edges:
+        incoming[second].append((first, weight))
+        outgoing[first].append(second)
+    from_inputs = _reachable(inputs, lambda node: outgoing[node])
+    to_outputs = _reachable(outputs, lambda node: (first for first, _ in incoming[node]))
+    kept = set(inputs) | set(outputs) | (from_inputs & to_outputs)
+
+    constant_nodes = nodes - from_inputs
+    constant_edges = [edge for edge in edges if edge[1] in constant_nodes]
+    depths = _node_depths([], constant_nodes, constant_edges)
+    values = {}
+    for node in sorted(constant_nodes, key=depths.get):
+        total = sum(weight * values[first] for first, weight in incoming[node])
+        values[node] = float(activations.ACTIVATIONS[node_activations[node]](np.float64(total)))
+
+    bias = {}
+    kept_edges = []
+    for first, second, weight in edges:
+        if second not in kept:
+            continue
+        if first in kept:
+            kept_edges.append((first, second, weight))
+        else:
+            bias[second] = bias.get(second, 0.0) + weight * values[first]
+    return kept, kept_edges, bias
+
+
+def _reachable(start: list[int], neighbours) -> set[int]:
+    seen = set(start)
+    stack = list(start)
+    while stack:
+        for node in neighbours(stack.pop()):
+            if node not in seen:
+                seen.add(node)
+                stack.append(node)
+    return seen
+
+
+def _node_depths(inputs: list[int], nodes: set[int], edges: list[tuple[int, int, float]]) -> dict[int, int]:
+    outgoing = {node: [] for node in nodes}
+    pending = {node: 0 for node in nodes}
+    for first, second, _ in edges:
+        outgoing[first].append(second)
+        pending[second] += 1
+
+    input_set = set(inputs)
+    depths = {node: 0 if node in input_set else 1 for node in nodes}
+    ready = [node for node in nodes if pending[node] == 0]
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for next_node in outgoing[node]:
+            depths[next_node] = max(depths[next_node], depths[node] + 1)
+            pending[next_node] -= 1
+            if pending[next_node] == 0:
+                ready.append(next_node)
+
+    if visited != len(nodes):
+        raise ValueError("Genome contains a cycle and cannot be compiled as a feed forward network.")
+    return depths
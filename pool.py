@@ -0,0 +1,63 @@
+from connection import Connection
+from genome import Genome
+
+
+class GenomePool:
+    def __init__(self, num_inputs: int, num_outputs: int) -> None:
+        """
+        Recycles genomes and connections between generations. The genomes
+        evaluated in one generation form an arena that is kept for one more
+        generation and then cleared and handed out again for new offspring,
+        so in steady state reproduction allocates almost nothing.
+
+        num_inputs: The number of inputs of every genome.
+        num_outputs: The number of outputs of every genome.
+        """
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.free_genomes: list[Genome] = []
+        self.free_connections: list[Connection] = []
+        self.previous: list[Genome] = []
+
+    def genome(self) -> Genome:
+        if self.free_genomes:
+            return self.free_genomes.pop()
+        return Genome(self.num_inputs, self.num_outputs)
+
+    def connection(self, first: int, second: int, weight: float, enabled: bool, innovation_id: int) -> Connection:
+        if not self.free_connections:
+            return Connection(first, second, weight, enabled, innovation_id)
+        connection = self.free_connections.pop()
+        connection.first = first
+        connection.second = second
+        connection.weight = weight
+        connection.enabled = enabled
+        connection.innovation_id = innovation_id
+        return connection
+
+    def copy_connection(self, connection: Connection) -> Connection:
+        return self.connection(connection.first, connection.second, connection.weight, connection.enabled, connection.innovation_id)
+
+    def copy(self, genome: Genome) -> Genome:
+        copy = self.genome()
+        for connection in genome.get_sorted_connections():
+            copy.add_connection(self.copy_connection(connection))
+        copy.node_activations.update(genome.node_activations)
+        copy.fitness = genome.fitness
+        return copy
+
+    def swap(self, population: list[Genome], keep: list[Genome]) -> None:
+        """
+        Recycles the previous arena, except the genomes in keep, and makes
+        population the next arena to be recycled. keep must contain every
+        genome that is still referenced, such as elites, the best genome and
+        species representatives.
+        """
+        keep_ids = set(id(genome) for genome in keep)
+        keep_ids.update(id(genome) for genome in population)
+        for genome in self.previous:
+            if id(genome) not in keep_ids:
+                self.free_connections.extend(genome.connections)
+                genome.clear()
+                self.free_genomes.append(genome)
+        self.previous = population
@@ -1,4 +1,8 @@
-import random
+from typing import Optional, Sequence, TypeVar, Union
+
+import numpy as np
+
+T = TypeVar("T")
 
 
 class RNG:
@@ -10,39 +14,125 @@ class RNG:
     NEW_CONNECTION_PROBABILITY = 0.1
     NEW_NODE_PROBABILITY = 0.01
     SHOULD_MUTATE_WITHOUT_CROSSOVER = 0.25
-
-    @staticmethod
-    def set_probabilities(probabilities: dict[str, float]):
-        # TODO: Define this function properly.
-        pass
-
-
-    def should_mutate_without_crossover() -> bool:
-        return random.random() < RNG.should_mutate_without_crossover
-
-
-    def should_inherit_average_weight() -> bool:
-        return random.random() < RNG.AVERAGE_WEIGHT_INHERITANCE_PROBABILITY
-    
-
-
-    def should_disabled_connection_be_inherited() -> bool:
-        return random.random() < RNG.DISABLED_CONNECTION_INHERITANCE_PROBABILITY
-    
-
-
-    def should_weights_change() -> bool:
-        return random.random() < RNG.WEIGHT_CHANGE_PROBABILITY
-    
-
-
-    def should_weights_be_perturbed() -> bool:
-        return random.random() < RNG.NORMAL_WEIGHT_CHANGE_PROBABILITY
-
-
-    def should_connection_be_added() -> bool:
-        return random.random() < RNG.NEW_CONNECTION_PROBABILITY
-
-
-    def should_node_be_added() -> bool:
-        return random.random() < RNG.NEW_CONNECTION_PROBABILITY
\ No newline at end of file
+    ACTIVATION_CHANGE_PROBABILITY = 0.05
+
+    PROBABILITIES = (
+        "AVERAGE_WEIGHT_INHERITANCE_PROBABILITY",
+        "DISABLED_CONNECTION_INHERITANCE_PROBABILITY",
+        "WEIGHT_CHANGE_PROBABILITY",
+        "NORMAL_WEIGHT_CHANGE_PROBABILITY",
+        "NEW_CONNECTION_PROBABILITY",
+        "NEW_NODE_PROBABILITY",
+        "SHOULD_MUTATE_WITHOUT_CROSSOVER",
+        "ACTIVATION_CHANGE_PROBABILITY",
+    )
+
+    def __init__(
+        self,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        probabilities: Optional[dict[str, float]] = None,
+        block_size: int = 1024,
+    ) -> None:
+        """
+        The source of every random decision of a run, backed by a numpy
+        Generator. Yes/no decisions are drawn in blocks of block_size as
+        boolean masks, one per kind of decision, so a whole generation's
+        decisions usually cost a single vectorized draw each.
+
+        seed(optional): An int or SeedSequence, a fresh one is used by default.
+        probabilities(optional): Overrides the default probabilities, see set_probabilities.
+        block_size(optional): How many decisions of each kind are drawn at a time.
+        """
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.block_size = block_size
+        # The pre-drawn decisions of each kind and how many of them were used.
+        self.masks: dict[str, tuple[list[bool], int]] = {}
+        self.set_probabilities(probabilities or {})
+
+    def set_probabilities(self, probabilities: dict[str, float]) -> None:
+        """
+        Overrides probabilities by name, e.g. {"new_node_probability": 0.03}.
+        Names are case insensitive and must be one of RNG.PROBABILITIES.
+        """
+        for name, probability in probabilities.items():
+            if name.upper() not in RNG.PROBABILITIES:
+                raise ValueError(f"Unknown probability '{name}', expected one of {list(RNG.PROBABILITIES)}.")
+            if not 0 <= probability <= 1:
+                raise ValueError(f"Probability '{name}' must be between 0 and 1, got {probability}.")
+            setattr(self, name.upper(), probability)
+        # Decisions drawn with the old probabilities are discarded.
+        self.masks = {}
+
+    def get_probabilities(self) -> dict[str, float]:
+        return {name: getattr(self, name) for name in RNG.PROBABILITIES}
+
+    def spawn(self, count: int) -> list["RNG"]:
+        """
+        Creates count independent generators with the same probabilities,
+        e.g. one per worker process. The streams only depend on this
+        generator's seed, so a run is reproducible however many processes
+        it uses.
+        """
+        return [RNG(child, self.get_probabilities(), self.block_size) for child in self.seed_sequence.spawn(count)]
+
+    def _decide(self, name: str) -> bool:
+        mask, used = self.masks.get(name, ((), 0))
+        if used == len(mask):
+            mask, used = (self.generator.random(self.block_size) < getattr(self, name)).tolist(), 0
+        self.masks[name] = (mask, used + 1)
+        return mask[used]
+
+    def should_mutate_without_crossover(self) -> bool:
+        return self._decide("SHOULD_MUTATE_WITHOUT_CROSSOVER")
+
+    def should_inherit_average_weight(self) -> bool:
+        return self._decide("AVERAGE_WEIGHT_INHERITANCE_PROBABILITY")
+
+    def should_disabled_connection_be_inherited(self) -> bool:
+        return self._decide("DISABLED_CONNECTION_INHERITANCE_PROBABILITY")
+
+    def should_weights_change(self) -> bool:
+        return self._decide("WEIGHT_CHANGE_PROBABILITY")
+
+    def should_weights_be_perturbed(self) -> bool:
+        return self._decide("NORMAL_WEIGHT_CHANGE_PROBABILITY")
+
+    def should_connection_be_added(self) -> bool:
+        return self._decide("NEW_CONNECTION_PROBABILITY")
+
+    def should_node_be_added(self) -> bool:
+        return self._decide("NEW_NODE_PROBABILITY")
+
+    def should_activation_change(self) -> bool:
+        return self._decide("ACTIVATION_CHANGE_PROBABILITY")
+
+    def random(self) -> float:
+        return float(self.generator.random())
+
+    def uniform(self, low: float, high: float) -> float:
+        return float(self.generator.uniform(low, high))
+
+    def choice(self, items: Sequence[T]) -> T:
+        return items[int(self.generator.integers(len(items)))]
+
+    def choices(self, items: Sequence[T], k: int) -> list[T]:
+        return [items[i] for i in self.generator.integers(len(items), size=k).tolist()]
+
+    def get_state(self) -> dict:
+        """
+        The generator's state, including unused pre-drawn decisions, for
+        checkpoints. It can be restored with set_state.
+        """
+        return {
+            "generator": self.generator.bit_generator.state,
+            "probabilities": self.get_probabilities(),
+            "block_size": self.block_size,
+            "masks": {name: [int(decision) for decision in mask[used:]] for name, (mask, used) in self.masks.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.set_probabilities(state["probabilities"])
+        self.block_size = state["block_size"]
+        self.generator.bit_generator.state = state["generator"]
+        self.masks = {name: ([bool(decision) for decision in mask], 0) for name, mask in state["masks"].items()}
@@ -0,0 +1,119 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+from genome import Genome
+from network import Network
+
+
+def _reset(env) -> np.ndarray:
+    # Supports both the gym (observation) and gymnasium (observation, info) reset interfaces.
+    result = env.reset()
+    return result[0] if isinstance(result, tuple) else result
+
+
+def _step(env, action) -> tuple[np.ndarray, float, bool]:
+    result = env.step(action)
+    if len(result) == 5:
+        observation, reward, terminated, truncated, _ = result
+        return observation, reward, terminated or truncated
+    observation, reward, done, _ = result
+    return observation, reward, done
+
+
+class VectorRollout:
+    def __init__(
+        self,
+        env_factory: Callable,
+        num_envs: int,
+        max_steps: int = 1000,
+        policy: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        refill_threshold: Optional[int] = None,
+    ) -> None:
+        """
+        Evaluates genomes on a pool of persistent environments stepped in
+        lockstep. On every step the networks of all live genomes are evaluated
+        in one batched call, and environments whose episode finished start
+        the next genome's episode. A genome's fitness is its total reward.
+        Recurrent genomes are reset at the start of their episode and step
+        their own recurrent network.
+
+        Starting new episodes means compiling a new batched network, so
+        environments whose episode finished wait until refill_threshold of
+        them are idle and are then refilled together.
+
+        env_factory: Creates an environment with the gym reset/step interface.
+        num_envs: How many environments, and so genomes, are stepped at once.
+        max_steps(optional): The most steps of any episode.
+        policy(optional): Turns a (num_live x num_outputs) output matrix into actions, defaults to the argmax of every row.
+        refill_threshold(optional): How many environments must be idle before they are refilled, defaults to a quarter of them.
+        """
+        self.envs = [env_factory() for _ in range(num_envs)]
+        self.max_steps = max_steps
+        self.policy = policy or (lambda outputs: outputs.argmax(axis=1))
+        self.refill_threshold = refill_threshold or max(1, num_envs // 4)
+
+    def run(self, genomes: list[Genome]) -> None:
+        pending = list(reversed(genomes))
+        # The genome, observation, total reward and step count of each environment's episode.
+        slots: list[Optional[list]] = [None] * len(self.envs)
+        # The environments in the batched network, in order. Idle ones are fed zeros and ignored.
+        # Recurrent genomes can't be batched, they step their own recurrent network instead.
+        members: list[int] = []
+        network = None
+        idle_inputs = np.zeros(genomes[0].num_inputs if genomes else 0)
+
+        while True:
+            idle = [i for i, slot in enumerate(slots) if slot is None]
+            if pending and idle and (len(idle) >= self.refill_threshold or len(idle) == len(slots)):
+                for i in idle[:len(pending)]:
+                    genome = pending.pop()
+                    genome.reset()
+                    slots[i] = [genome, _reset(self.envs[i]), 0.0, 0]
+                members = [i for i, slot in enumerate(slots) if slot is not None and not slot[0].recurrent]
+                network = Network.combine([slots[i][0].get_network() for i in members], shared_inputs=False) if members else None
+            if all(slot is None for slot in slots):
+                break
+
+            outputs = {}
+            if network is not None:
+                observations = np.concatenate([
+                    idle_inputs if slots[i] is None else np.asarray(slots[i][1], dtype=np.float64).ravel() for i in members
+                ])
+                outputs = dict(zip(members, network.activate(observations).reshape(len(members), -1)))
+            for i, slot in enumerate(slots):
+                if slot is not None and slot[0].recurrent:
+                    recurrent_network = slot[0].get_recurrent_network()
+                    recurrent_network.inputs[:] = np.asarray(slot[1], dtype=np.float64).ravel()
+                    outputs[i] = recurrent_network.step()
+            active = [i for i, slot in enumerate(slots) if slot is not None]
+            actions = self.policy(np.stack([outputs[i] for i in active]))
+            for i, action in zip(active, actions.tolist()):
+                slot = slots[i]
+                slot[1], reward, done = _step(self.envs[i], action)
+                slot[2] += reward
+                slot[3] += 1
+                if done or slot[3] >= self.max_steps:
+                    slot[0].fitness = slot[2]
+                    slots[i] = None
+
+    def close(self) -> None:
+        for env in self.envs:
+            env.close()
+
+
+class RolloutEvaluator:
+    """
+    An evaluator for Neat that runs every genome through a VectorRollout
+    instead of calling a fitness function, e.g.
+    Neat(4, 2, 250, evaluator=RolloutEvaluator(VectorRollout(lambda: gym.make("CartPole-v0"), 32))).
+    """
+
+    def __init__(self, rollout: VectorRollout) -> None:
+        self.rollout = rollout
+
+    async def evaluate(self, genomes: list[Genome], fitness_function: Callable) -> None:
+        self.rollout.run(genomes)
+
+    def close(self) -> None:
+        self.rollout.close()
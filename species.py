@@ -1,21 +1,25 @@
-import random
 import math
 from typing import List
 
+import numpy as np
+
 import config
 from genome import Genome
+from rng import RNG
 
 
 class Species:
     def __init__(self, genome: Genome) -> None:
         self.genomes = [genome]
+        # The genome new genomes are compared against, kept for the lifetime of the species.
+        self.representative = genome
         self.age = 1
         self.to_produce = 0
     
-    def random_genome(self) -> Genome:
+    def random_genome(self, rng: RNG) -> Genome:
         if len(self.genomes) == 0: 
             raise RuntimeError()
-        return random.choice(self.genomes)
+        return rng.choice(self.genomes)
 
     def get_top_of_species(self) -> List[Genome]:
         self.genomes.sort(key=lambda genome: genome.fitness)
@@ -25,4 +29,28 @@ class Species:
         return sum(genome.fitness for genome in self.genomes) / len(self.genomes)
 
     def add_genome(self, genome: Genome) -> None:
-        self.genomes.append(genome)
\ No newline at end of file
+        self.genomes.append(genome)
+
+
+def calculate_distance(first: tuple[np.ndarray, np.ndarray], second: tuple[np.ndarray, np.ndarray]) -> float:
+    """
+    The compatibility distance between two genomes, given as the sorted
+    innovation ids and weights returned by Genome.get_gene_arrays.
+    """
+    first_innovations, first_weights = first
+    second_innovations, second_weights = second
+    _, first_index, second_index = np.intersect1d(first_innovations, second_innovations, assume_unique=True, return_indices=True)
+    shared_weights = len(first_index)
+    gene_differences = len(first_innovations) + len(second_innovations) - 2 * shared_weights
+    if shared_weights == 0:
+        return float(gene_differences)
+    weight_differences = first_weights[first_index].sum() + second_weights[second_index].sum()
+    return gene_differences + config.C3 * (weight_differences / (shared_weights * 2))
+
+
+def distance_matrix(genes: list[tuple], representatives: list[tuple]) -> np.ndarray:
+    distances = np.empty((len(genes), len(representatives)))
+    for i, first in enumerate(genes):
+        for j, second in enumerate(representatives):
+            distances[i, j] = calculate_distance(first, second)
+    return distances
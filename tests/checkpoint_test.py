@@ -0,0 +1,51 @@
+from checkpoint import read_checkpoint
+from innovation import InnovationTracker
+from neat import Neat
+import asyncio
+import numpy as np
+import os
+import random
+import tempfile
+import unittest
+
+
+async def count_connections(genome):
+    genome.fitness = len(genome.connections) + 1
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_resumed_run_matches(self):
+        random.seed(0)
+        n = Neat(2, 1, 20, count_connections, seed=0)
+        asyncio.run(n.create_generation())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.npz")
+            n.save_checkpoint(path)
+            asyncio.run(n.create_generation())
+            resumed = Neat.load_checkpoint(path, count_connections)
+        asyncio.run(resumed.create_generation())
+
+        self.assertEqual(resumed.generation, n.generation)
+        self.assertEqual(
+            [sorted(genome.serialize()[2]) for genome in resumed.population],
+            [sorted(genome.serialize()[2]) for genome in n.population],
+        )
+
+    def test_arrays_are_memory_mapped(self):
+        n = Neat(2, 1, 5, count_connections, seed=0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.npz")
+            n.save_checkpoint(path)
+            header, genomes, arrays = read_checkpoint(path)
+            self.assertIsInstance(arrays["offsets"], np.memmap)
+            self.assertEqual(header["num_inputs"], 2)
+            self.assertEqual(len(genomes), 5)
+            del arrays
+
+    def test_shared_tracker_is_refused(self):
+        n = Neat(2, 1, 5, count_connections, seed=0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.npz")
+            n.save_checkpoint(path)
+            with self.assertRaises(ValueError):
+                Neat.load_checkpoint(path, count_connections, innovations=InnovationTracker(4))
@@ -0,0 +1,53 @@
+from connection import Connection
+from evaluator import PoolEvaluator, ProcessEvaluator, ThreadEvaluator
+from genome import Genome
+from neat import Neat
+import asyncio
+import unittest
+
+
+# Fitness functions must be defined at the top level to be sent to worker processes.
+def output_fitness(genome):
+    return 1 + float(genome.feed_forward([0.5, -1.0])[0]) + len(genome.connections)
+
+
+async def async_output_fitness(genome):
+    genome.fitness = output_fitness(genome)
+
+
+class TestEvaluators(unittest.TestCase):
+    def create_genomes(self):
+        return [
+            Genome(2, 1, {Connection(1, 3, i / 10, True, 1), Connection(2, 3, 0.5, i % 2 == 0, 2)})
+            for i in range(11)
+        ]
+
+    def test_pool_evaluator_is_abstract(self):
+        with self.assertRaises(TypeError):
+            PoolEvaluator()
+
+    def test_chunked_evaluation_writes_fitness_back(self):
+        for evaluator_class in (ThreadEvaluator, ProcessEvaluator):
+            for fitness_function in (output_fitness, async_output_fitness):
+                genomes = self.create_genomes()
+                # 11 genomes in chunks of 3, so the last chunk is short.
+                evaluator = evaluator_class(workers=2, chunks_per_worker=2)
+                try:
+                    asyncio.run(evaluator.evaluate(genomes, fitness_function))
+                finally:
+                    evaluator.close()
+                self.assertEqual([genome.fitness for genome in genomes], [output_fitness(genome) for genome in genomes])
+
+    def test_neat_with_pool_evaluators(self):
+        for name in ("thread", "process"):
+            n = Neat(2, 1, 20, output_fitness, evaluator=name, workers=2, seed=0)
+            try:
+                asyncio.run(n.create_generation())
+                asyncio.run(n.calculate_fitness())
+            finally:
+                n.close()
+            self.assertEqual([genome.fitness for genome in n.population], [output_fitness(genome) for genome in n.population])
+
+
+if __name__ == "__main__":
+    unittest.main()
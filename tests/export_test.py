@@ -0,0 +1,43 @@
+from connection import Connection
+from export import export_network, load_network
+from genome import Genome
+import numpy as np
+import os
+import tempfile
+import unittest
+
+
+class TestExport(unittest.TestCase):
+    def export_and_load(self, genome):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "network.net")
+            export_network(genome.get_network(), path)
+            loaded = load_network(path)
+            if genome.connections:
+                # The compiled arrays are used straight from the file.
+                self.assertIsInstance(loaded.weight, np.memmap)
+                self.assertIsInstance(loaded.layers[0][4], np.memmap)
+            # Reads every memory-mapped array before the file is removed.
+            inputs = np.array([[0.3, 1.0, -2.0], [0.9, 2.0, 0.5]])
+            return loaded.activate(inputs), genome.get_network().activate(inputs)
+
+    def test_round_trip(self):
+        genome = Genome(2, 2, {
+            Connection(1, 4, 0.5, True, 1),
+            Connection(2, 5, 0.3, True, 2),
+            Connection(5, 4, -0.7, True, 3),
+            Connection(5, 3, 0.2, True, 4),
+            Connection(6, 3, 1.5, True, 5),
+        })
+        genome.set_activation(5, "relu")
+        genome.set_activation(4, "tanh")
+        loaded, expected = self.export_and_load(genome)
+        np.testing.assert_array_equal(loaded, expected)
+
+    def test_network_without_connections(self):
+        loaded, expected = self.export_and_load(Genome(2, 1))
+        np.testing.assert_array_equal(loaded, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+from connection import Connection
+from genes import GeneArrays
+from genome import Genome
+import unittest
+
+
+def genes(genome):
+    return sorted(genome.serialize()[2])
+
+
+class TestGeneArrays(unittest.TestCase):
+    def create_genome(self):
+        genome = Genome(2, 1, {
+            Connection(1, 3, 0.5, True, 1),
+            Connection(2, 3, -0.5, True, 2),
+            Connection(1, 4, 0.2, False, 3),
+            Connection(4, 3, 0.7, True, 5),
+        })
+        genome.set_activation(4, "relu")
+        genome.set_activation(3, "tanh")
+        genome.fitness = 1.0
+        return genome
+
+    def test_genome_round_trip(self):
+        genome = self.create_genome()
+        arrays = GeneArrays.from_genome(genome)
+        self.assertEqual(genes(arrays.to_genome()), genes(genome))
+        self.assertEqual(arrays.to_genome().fitness, genome.fitness)
+        self.assertEqual(arrays.to_genome().node_activations, {3: "tanh", 4: "relu"})
+        self.assertEqual(arrays.copy().to_genome().node_activations, genome.node_activations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -59,3 +59,37 @@ class TestGenomes(unittest.TestCase):
         # 1 + 2 * 
         self.assertEqual(n.calculate_distance(first, second), 1.75)
         
+
+    def test_connection_lookup(self):
+        n = Neat(2, 2, 1)
+        genome = Genome(2, 2)
+        connection = n.create_connection((1, 3), 0.5)
+        genome.add_connection(connection)
+        genome.add_connection(n.create_connection((2, 4), 0.25))
+        self.assertIs(genome.get_connection(connection), connection)
+        self.assertEqual(genome.get_connection_weight(connection), 0.5)
+        self.assertTrue(genome.get_connection_enabled(connection))
+        self.assertEqual(genome.innovations, sorted(con.innovation_id for con in genome.connections))
+
+    def test_cross_over(self):
+        n = Neat(2, 2, 1)
+        first = Genome(2, 2)
+        second = Genome(2, 2)
+        first.add_connection(n.create_connection((1, 3), 0.75))
+        first.add_connection(n.create_connection((1, 4), 0.5))
+        second.add_connection(n.create_connection((1, 4), 0.25))
+        second.add_connection(n.create_connection((2, 3), 0.25))
+        child = n.cross_over(first, second)
+        self.assertEqual(child.innovations, sorted(set(first.innovations) | set(second.innovations)))
+
+    def test_add_connection_updates_nodes(self):
+        n = Neat(2, 1, 1)
+        genome = Genome(2, 1)
+        connection = n.create_connection((1, 3), 0.5)
+        genome.add_connection(connection)
+        genome.disable_connection(connection)
+        genome.add_connection(n.create_connection((1, 4), 1.0))
+        genome.add_connection(n.create_connection((4, 3), 0.5))
+        self.assertEqual(genome.nodes["hidden"], {4})
+        self.assertEqual(genome.max_node, 4)
+        self.assertEqual(genome.connection_map[3], [4])
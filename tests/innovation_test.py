@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+from innovation import InnovationTracker
+import multiprocessing
+import unittest
+
+worker_tracker = None
+
+
+def create_innovations(tracker: InnovationTracker, node: int, queue) -> None:
+    queue.put([tracker.get_innovation(1, node + i) for i in range(100)])
+
+
+def set_worker_tracker(tracker: InnovationTracker) -> None:
+    global worker_tracker
+    worker_tracker = tracker
+
+
+def create_worker_innovations(node: int) -> list[int]:
+    return [worker_tracker.get_innovation(1, node + i) for i in range(100)]
+
+
+def count_innovations(tracker: InnovationTracker) -> int:
+    return len(tracker.connections)
+
+
+class TestInnovationTracker(unittest.TestCase):
+    def test_same_connection_same_id(self):
+        tracker = InnovationTracker(4)
+        first = tracker.get_innovation(1, 3)
+        self.assertNotEqual(tracker.get_innovation(2, 3), first)
+        self.assertEqual(tracker.get_innovation(1, 3), first)
+        self.assertEqual(tracker.new_generation(), {(1, 3): first, (2, 3): first + 1})
+        self.assertEqual(tracker.new_generation(), {})
+
+    def test_ids_are_unique_across_processes(self):
+        tracker = InnovationTracker(4, block_size=16)
+        tracker.get_innovation(1, 3)
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=create_innovations, args=(tracker, 1000 * i, queue)) for i in range(3)]
+        for process in processes:
+            process.start()
+        ids = [innovation for _ in processes for innovation in queue.get()]
+        for process in processes:
+            process.join()
+        ids += [tracker.get_innovation(2, 3 + i) for i in range(100)]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_merge(self):
+        tracker = InnovationTracker(4)
+        worker = InnovationTracker(4)
+        worker.innovation_ids = tracker.innovation_ids
+        ours = tracker.get_innovation(1, 3)
+        theirs = worker.get_innovation(1, 3)
+        new = worker.get_innovation(2, 3)
+        self.assertEqual(tracker.merge(worker.new_generation()), {theirs: ours})
+        self.assertEqual(tracker.get_innovation(2, 3), new)
+
+    def test_ids_are_unique_across_pool_workers(self):
+        tracker = InnovationTracker(4, block_size=16)
+        with ProcessPoolExecutor(3, initializer=set_worker_tracker, initargs=(tracker,)) as executor:
+            ids = [innovation for ids in executor.map(create_worker_innovations, range(0, 6000, 1000)) for innovation in ids]
+            # A tracker can't be sent to a worker that is already running.
+            with self.assertRaises(RuntimeError):
+                executor.submit(count_innovations, tracker).result()
+        ids += [tracker.get_innovation(2, 3 + i) for i in range(100)]
+        self.assertEqual(len(set(ids)), len(ids))
+
@@ -0,0 +1,48 @@
+from connection import Connection
+from genome import Genome
+from innovation import InnovationTracker
+from islands import _receive_migrants, run_islands
+from neat import Neat
+import unittest
+
+
+async def count_connections(genome):
+    genome.fitness = len(genome.connections) + 1
+
+
+async def fail_on_hidden_nodes(genome):
+    if genome.nodes["hidden"]:
+        raise ValueError("hidden nodes aren't allowed")
+    genome.fitness = len(genome.connections) + 1
+
+
+class TestIslands(unittest.TestCase):
+    def test_run_islands(self):
+        best = run_islands(2, 2, 1, 20, count_connections, 4, migration_interval=2, seed=0)
+        self.assertEqual(len(best), 2)
+        for genome in best:
+            self.assertEqual(genome.fitness, len(genome.connections) + 1)
+
+    def test_failing_island_raises(self):
+        # Every island eventually adds a hidden node, which makes its fitness function raise.
+        with self.assertRaisesRegex(RuntimeError, "hidden nodes aren't allowed"):
+            run_islands(2, 2, 1, 20, fail_on_hidden_nodes, 200, migration_interval=2, seed=0, probabilities={"new_node_probability": 1.0})
+
+    def test_migrants_use_local_innovation_ids(self):
+        n = Neat(2, 1, 5, count_connections, seed=0)
+        local_id = n.innovations.get_innovation(1, 3)
+        # The same connection, created independently on another island with another id.
+        other = InnovationTracker(4)
+        other.get_innovation(2, 3)
+        other_id = other.get_innovation(1, 3)
+        self.assertNotEqual(other_id, local_id)
+        migrant = Genome(2, 1, {Connection(1, 3, 0.5, True, other_id), Connection(2, 3, 0.1, True, 99)})
+        _receive_migrants(n, [migrant.serialize()])
+        received = n.population[-1]
+        genes = {con.innovation_id: (con.first, con.second, con.weight) for con in received.connections}
+        self.assertEqual(genes, {local_id: (1, 3, 0.5), 99: (2, 3, 0.1)})
+        self.assertEqual(n.innovations.get_innovation(2, 3), 99)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+from neat import Neat
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+
+async def count_connections(genome):
+    genome.fitness = len(genome.connections) + 1
+
+
+class TestMetrics(unittest.TestCase):
+    def test_metrics_are_written_every_generation(self):
+        received = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.jsonl")
+            n = Neat(2, 1, 30, count_connections, seed=0, metrics_path=path)
+            n.add_hook(received.append)
+            for _ in range(2):
+                population = len(n.population)
+                asyncio.run(n.create_generation())
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines, json.loads(json.dumps(received)))
+        metrics = lines[-1]
+        self.assertTrue({
+            "generation", "population", "species", "species_sizes", "average_fitness", "best_fitness",
+            "genome_size", "simplification", "evaluations_per_second", "timings",
+        } <= set(metrics))
+        self.assertEqual(metrics["generation"], 1)
+        self.assertEqual(metrics["population"], population)
+        self.assertEqual(sum(metrics["species_sizes"]), population)
+        self.assertEqual(len(metrics["species_sizes"]), metrics["species"])
+        self.assertEqual(set(metrics["timings"]), {"speciation", "fitness", "reproduction", "mutation", "total"})
+        self.assertAlmostEqual(metrics["timings"]["total"], sum(value for key, value in metrics["timings"].items() if key != "total"))
+        self.assertTrue(all(value >= 0 for value in metrics["timings"].values()))
+        self.assertLessEqual(metrics["genome_size"]["min"], metrics["genome_size"]["max"])
+        self.assertLessEqual(metrics["average_fitness"], metrics["best_fitness"])
+        self.assertLessEqual(metrics["best_fitness"], n.best_genome.fitness)
+
+
+if __name__ == "__main__":
+    unittest.main()
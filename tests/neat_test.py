@@ -0,0 +1,111 @@
+from connection import Connection
+from fitness_cache import FitnessCache
+from genome import Genome
+from neat import Neat
+import asyncio
+import config
+import random
+import unittest
+
+
+async def xor_error(genome):
+    cases = [((0, 0), 0), ((0, 1), 1), ((1, 0), 1), ((1, 1), 0)]
+    genome.fitness = 1 + sum(abs(genome.feed_forward(inputs)[0] - output) for inputs, output in cases)
+
+
+class TestNeat(unittest.TestCase):
+    def create_genomes(self, n: Neat):
+        genomes = [Genome(2, 2) for _ in range(3)]
+        for genome in genomes:
+            genome.add_connection(n.create_connection((1, 3), 0.5))
+            genome.add_connection(n.create_connection((2, 4), -0.5))
+        return genomes
+
+    def test_weight_mutation_is_reproducible(self):
+        weights = []
+        for _ in range(2):
+            n = Neat(2, 2, 1, seed=42)
+            genomes = self.create_genomes(n)
+            n._mutate_weights(genomes)
+            weights.append([con.weight for genome in genomes for con in genome.get_sorted_connections()])
+        self.assertEqual(weights[0], weights[1])
+        self.assertTrue(all(weight not in (0.5, -0.5) for weight in weights[0]))
+
+    def test_separate_species(self):
+        n = Neat(2, 2, 1)
+        n.population = [Genome(2, 2, {Connection(1, 3, 0.5, True, 1), Connection(2, 4, -0.5, True, 2)}) for _ in range(3)]
+        n.population.append(Genome(2, 2, {Connection(1, 4, 1.0, True, 3), Connection(2, 3, 1.0, True, 4)}))
+        n.separate_species()
+        self.assertEqual(sorted(len(species.genomes) for species in n.species), [1, 3])
+        self.assertTrue(all(species.representative in species.genomes for species in n.species))
+        self.assertEqual(sum(len(species.genomes) for species in n.species), len(n.population))
+
+    def test_distance_cache_hits_across_generations(self):
+        n = Neat(2, 1, 100, xor_error, seed=0)
+        computed = []
+        calculate_distance = n.calculate_distance
+        n.calculate_distance = lambda first, second: computed.append((first, second)) or calculate_distance(first, second)
+        lookups = []
+        cached_distance = n._cached_distance
+        n._cached_distance = lambda first, second: lookups.append((first, second)) or cached_distance(first, second)
+        for _ in range(3):
+            computed.clear()
+            lookups.clear()
+            asyncio.run(n.create_generation())
+        self.assertGreater(len(lookups), len(computed))
+        self.assertTrue(all(key[2] in {species.representative.id for species in n.species} for key in n.distance_cache))
+
+    def test_population_size_is_kept_with_many_species(self):
+        threshold = config.COMPATABILITY_DISTANCE_THRESHOLD
+        # A low threshold splits the population into many small species.
+        config.COMPATABILITY_DISTANCE_THRESHOLD = 0.5
+        try:
+            n = Neat(2, 1, 150, xor_error, seed=1)
+            for _ in range(10):
+                asyncio.run(n.create_generation())
+                self.assertEqual(len(n.population), 150)
+        finally:
+            config.COMPATABILITY_DISTANCE_THRESHOLD = threshold
+        self.assertGreater(len(n.species), 20)
+
+    def test_recycled_genomes_give_same_run(self):
+        populations = []
+        for recycle_genomes in (False, True):
+            random.seed(0)
+            n = Neat(2, 1, 50, xor_error, seed=0, recycle_genomes=recycle_genomes)
+            for _ in range(5):
+                asyncio.run(n.create_generation())
+            populations.append([sorted(genome.serialize()[2]) for genome in n.population])
+        self.assertEqual(populations[0], populations[1])
+        self.assertGreater(len(n.pool.free_connections), 0)
+
+    def test_seeded_run_does_not_use_global_random(self):
+        populations = []
+        for global_seed in (0, 1):
+            random.seed(global_seed)
+            n = Neat(2, 1, 30, xor_error, seed=3)
+            for _ in range(3):
+                asyncio.run(n.create_generation())
+            populations.append([sorted(genome.serialize()[2]) for genome in n.population])
+        self.assertEqual(populations[0], populations[1])
+
+    def test_fitness_cache(self):
+        evaluated = []
+
+        async def fitness(genome):
+            evaluated.append(genome)
+            genome.fitness = len(genome.connections) + 1
+
+        n = Neat(2, 2, 1, fitness, fitness_cache=FitnessCache(max_size=2))
+        n.population = self.create_genomes(n)
+        asyncio.run(n.calculate_fitness())
+        self.assertEqual(len(evaluated), 1)
+        self.assertEqual([genome.fitness for genome in n.population], [3, 3, 3])
+
+        n.population[0].add_connection(n.create_connection((1, 4), 0.1))
+        n.population[1].set_activation(3, "relu")
+        asyncio.run(n.calculate_fitness())
+        self.assertEqual(len(evaluated), 3)
+        self.assertEqual((n.fitness_cache.hits, n.fitness_cache.misses), (1, 3))
+        self.assertEqual(n.evaluations, 2)
+        self.assertEqual(len(n.fitness_cache.entries), 2)
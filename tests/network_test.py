@@ -0,0 +1,109 @@
+from connection import Connection
+from genome import Genome
+import activations
+import network
+import numpy as np
+import unittest
+
+
+class TestNetwork(unittest.TestCase):
+    def create_genome(self):
+        connections = {
+            Connection(1, 4, 0.5, True, 1),
+            Connection(2, 5, 0.3, True, 2),
+            Connection(5, 4, -0.7, True, 3),
+            Connection(1, 5, 0.9, False, 4),
+            Connection(5, 3, 0.2, True, 5),
+        }
+        return Genome(2, 2, connections)
+
+    def test_feed_forward(self):
+        genome = self.create_genome()
+        hidden = activations.neat_sigmoid(0.3 * 0.9)
+        expected = [activations.neat_sigmoid(0.2 * hidden), activations.neat_sigmoid(0.5 * 0.3 - 0.7 * hidden)]
+        np.testing.assert_allclose(genome.feed_forward([0.3, 0.9]), expected)
+
+    def test_batch_matches_single(self):
+        genome = self.create_genome()
+        inputs = np.array([[0.3, 1.0, -2.0], [0.9, 2.0, 0.5]])
+        results = genome.get_network().activate(inputs)
+        self.assertEqual(results.shape, (2, 3))
+        for column in range(inputs.shape[1]):
+            np.testing.assert_allclose(results[:, column], genome.feed_forward(inputs[:, column]))
+
+    def test_network_is_cached_until_connections_change(self):
+        genome = self.create_genome()
+        compiled = genome.get_network()
+        self.assertIs(genome.get_network(), compiled)
+        genome.add_connection(Connection(2, 3, 0.1, True, 6))
+        self.assertIsNot(genome.get_network(), compiled)
+
+    def test_cycle_is_rejected(self):
+        genome = self.create_genome()
+        genome.add_connection(Connection(4, 5, 0.1, True, 6))
+        with self.assertRaises(ValueError):
+            genome.feed_forward([0.3, 0.9])
+
+    def test_activate_population(self):
+        genomes = [self.create_genome(), Genome(2, 2, {Connection(1, 3, 0.4, True, 1)}), Genome(2, 2)]
+        inputs = np.array([[0.0, 1.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]])
+        results = network.activate_population(genomes, inputs)
+        self.assertEqual(results.shape, (3, 2, 4))
+        for genome, result in zip(genomes, results):
+            np.testing.assert_allclose(result, genome.get_network().activate(inputs))
+
+    def test_per_node_activations(self):
+        genome = self.create_genome()
+        genome.set_activation(5, "relu")
+        genome.set_activation(4, "identity")
+        hidden = max(0.3 * 0.9, 0)
+        expected = [activations.neat_sigmoid(0.2 * hidden), 0.5 * 0.3 - 0.7 * hidden]
+        np.testing.assert_allclose(genome.feed_forward([0.3, 0.9]), expected)
+        np.testing.assert_allclose(network.activate_population([genome], [0.3, 0.9])[0], expected)
+
+    def test_simplified_network_matches_genome(self):
+        genome = self.create_genome()
+        # Node 6 can't reach an output, node 7 is a constant that no input reaches.
+        genome.add_connection(Connection(1, 6, 0.4, True, 6))
+        genome.add_connection(Connection(7, 4, 0.8, True, 7))
+        hidden = activations.neat_sigmoid(0.3 * 0.9)
+        constant = 0.8 * activations.neat_sigmoid(0.0)
+        expected = [activations.neat_sigmoid(0.2 * hidden), activations.neat_sigmoid(0.5 * 0.3 - 0.7 * hidden + constant)]
+        compiled = genome.get_network()
+        np.testing.assert_allclose(compiled.activate([0.3, 0.9]), expected)
+        np.testing.assert_allclose(network.activate_population([genome, genome], [0.3, 0.9])[1], expected)
+        self.assertEqual((compiled.removed_nodes, compiled.removed_connections), (2, 3))
+
+    def test_from_arrays_matches(self):
+        genome = self.create_genome()
+        genome.set_activation(4, "tanh")
+        compiled = genome.get_network()
+        rebuilt = network.Network.from_arrays(compiled.num_inputs, compiled.to_arrays())
+        inputs = np.array([[0.3, 1.0, -2.0], [0.9, 2.0, 0.5]])
+        np.testing.assert_array_equal(rebuilt.activate(inputs), compiled.activate(inputs))
+
+    def test_recurrent_network(self):
+        genome = Genome(1, 1, {Connection(1, 2, 1.0, True, 1), Connection(2, 2, 0.5, True, 2)})
+        genome.set_activation(2, "identity")
+        recurrent = genome.get_recurrent_network()
+        self.assertEqual([recurrent.step([1.0])[0] for _ in range(3)], [1.0, 1.5, 1.75])
+        recurrent.reset()
+        self.assertEqual(recurrent.step([1.0])[0], 1.0)
+
+    def test_recurrent_genome_feed_forward(self):
+        genome = Genome(1, 1, {Connection(1, 2, 1.0, True, 1), Connection(2, 2, 0.5, True, 2)})
+        genome.set_activation(2, "identity")
+        genome.recurrent = True
+        self.assertEqual([genome.feed_forward([1.0])[0] for _ in range(3)], [1.0, 1.5, 1.75])
+        genome.reset()
+        recurrent = genome.get_recurrent_network()
+        recurrent.inputs[:] = 1.0
+        self.assertEqual(recurrent.step()[0], 1.0)
+        self.assertTrue(Genome.deserialize(genome.serialize()).recurrent)
+
+    def test_recurrent_network_matches_feed_forward_when_settled(self):
+        genome = self.create_genome()
+        recurrent = genome.get_recurrent_network()
+        for _ in range(3):
+            results = recurrent.step([0.3, 0.9])
+        np.testing.assert_allclose(results, genome.feed_forward([0.3, 0.9]))
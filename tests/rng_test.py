@@ -0,0 +1,37 @@
+from rng import RNG
+import unittest
+
+
+class TestRNG(unittest.TestCase):
+    def draw(self, rng: RNG):
+        return [rng.should_connection_be_added() for _ in range(50)] + [rng.choice("abcdef") for _ in range(10)]
+
+    def test_seeded_decisions_are_reproducible(self):
+        self.assertEqual(self.draw(RNG(7, block_size=16)), self.draw(RNG(7, block_size=16)))
+        self.assertNotEqual(self.draw(RNG(7)), self.draw(RNG(8)))
+
+    def test_set_probabilities(self):
+        rng = RNG(0, {"new_node_probability": 1.0})
+        self.assertEqual(rng.NEW_NODE_PROBABILITY, 1.0)
+        self.assertEqual(RNG.NEW_NODE_PROBABILITY, 0.01)
+        self.assertTrue(all(rng.should_node_be_added() for _ in range(100)))
+        with self.assertRaises(ValueError):
+            rng.set_probabilities({"no_such_probability": 0.5})
+        with self.assertRaises(ValueError):
+            rng.set_probabilities({"new_node_probability": 2.0})
+
+    def test_spawned_streams(self):
+        first, second = RNG(3).spawn(2)
+        self.assertNotEqual(self.draw(first), self.draw(second))
+        self.assertEqual(self.draw(RNG(3).spawn(2)[1]), self.draw(RNG(3).spawn(2)[1]))
+
+    def test_state_round_trip(self):
+        rng = RNG(5, block_size=8)
+        self.draw(rng)
+        restored = RNG()
+        restored.set_state(rng.get_state())
+        self.assertEqual(self.draw(restored), self.draw(rng))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from connection import Connection
+from genome import Genome
+from network import Network
+from rollout import VectorRollout
+import numpy as np
+import unittest
+
+
+class CountingEnv:
+    # Rewards choosing action 1 and ends after three steps, with the gymnasium interface.
+    def reset(self):
+        self.steps = 0
+        return np.array([1.0]), {}
+
+    def step(self, action):
+        self.steps += 1
+        return np.array([1.0]), float(action), self.steps == 3, False, {}
+
+    def close(self):
+        pass
+
+
+class OldCountingEnv(CountingEnv):
+    # The same environment with the older gym interface.
+    def reset(self):
+        return super().reset()[0]
+
+    def step(self, action):
+        observation, reward, terminated, _, info = super().step(action)
+        return observation, reward, terminated, info
+
+
+class ActionLengthEnv(CountingEnv):
+    # Rewards every step, and episodes choosing action 1 last twice as long, so they end at different steps.
+    def step(self, action):
+        self.steps += 1
+        return np.array([1.0]), 1.0, self.steps == 2 + 2 * action, False, {}
+
+
+class TestRollout(unittest.TestCase):
+    def create_genomes(self):
+        # Prefers output 1, i.e. action 1, when the weight to it is larger.
+        return [
+            Genome(1, 2, {Connection(1, 2, 1.0, True, 1), Connection(1, 3, weight, True, 2)})
+            for weight in (2.0, -2.0, 3.0, 0.0, -1.0)
+        ]
+
+    def test_fitness_is_total_reward(self):
+        for env in (CountingEnv, OldCountingEnv):
+            genomes = self.create_genomes()
+            VectorRollout(env, 2).run(genomes)
+            self.assertEqual([genome.fitness for genome in genomes], [3.0, 0.0, 3.0, 0.0, 0.0])
+
+    def test_refills_are_batched(self):
+        genomes = [genome for _ in range(4) for genome in self.create_genomes()]
+        combine = Network.combine
+        calls = []
+        Network.combine = classmethod(lambda cls, *args, **kwargs: calls.append(args) or combine(*args, **kwargs))
+        try:
+            VectorRollout(ActionLengthEnv, 4, refill_threshold=2).run(genomes)
+        finally:
+            Network.combine = combine
+        self.assertEqual([genome.fitness for genome in genomes], [4.0, 2.0, 4.0, 2.0, 2.0] * 4)
+        self.assertLessEqual(len(calls), len(genomes) // 2)
+
+    def test_fewer_genomes_than_environments(self):
+        genomes = self.create_genomes()[:2]
+        VectorRollout(CountingEnv, 4).run(genomes)
+        self.assertEqual([genome.fitness for genome in genomes], [3.0, 0.0])
+
+    def test_recurrent_genomes(self):
+        # Output 2 only overtakes output 1 once its self connection has fed back, so the first step chooses action 0.
+        recurrent = Genome(1, 2, {Connection(1, 2, 1.0, True, 1), Connection(1, 3, 0.9, True, 2), Connection(3, 3, 5.0, True, 3)})
+        recurrent.recurrent = True
+        genomes = self.create_genomes()[:2] + [recurrent, recurrent.copy()]
+        VectorRollout(CountingEnv, 2).run(genomes)
+        self.assertEqual([genome.fitness for genome in genomes], [3.0, 0.0, 2.0, 2.0])
+
+    def test_max_steps(self):
+        genomes = self.create_genomes()
+        VectorRollout(CountingEnv, 3, max_steps=2).run(genomes)
+        self.assertEqual([genome.fitness for genome in genomes], [2.0, 0.0, 2.0, 0.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()